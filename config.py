@@ -1,12 +1,16 @@
 """Configuration settings for the application."""
-import os
-from typing import Optional
-from functools import lru_cache
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, fields
+from typing import Final, Optional
 
 # Constants - defined first to avoid circular imports
 # Common Salesforce instance URLs (for reference/defaults)
 SALESFORCE_PRODUCTION_URL = "https://login.salesforce.com"
 SALESFORCE_SANDBOX_URL = "https://test.salesforce.com"
+# Default for DEV or unspecified deployments - use your specific org URL
+SALESFORCE_DEV_URL = "https://cloudblazer2-dev-ed.develop.my.salesforce.com"
 
 # Salesforce API endpoint paths (these are constant across all orgs)
 SALESFORCE_AUTH_URL = "/services/oauth2/authorize"
@@ -16,6 +20,17 @@ SALESFORCE_DESCRIBE_URL = "/services/data/{version}/sobjects/{object_name}/descr
 SALESFORCE_QUERY_URL = "/services/data/{version}/query"
 SALESFORCE_TOOLING_QUERY_URL = "/services/data/{version}/tooling/query"
 SALESFORCE_UI_API_APPS_URL = "/services/data/{version}/ui-api/apps"
+SALESFORCE_COMPOSITE_URL = "/services/data/{version}/composite"
+# Salesforce accepts at most 25 subrequests per composite request
+SALESFORCE_COMPOSITE_MAX_SUBREQUESTS = 25
+# Ids per SOQL "WHERE Id IN (...)" query, keeping the query URL well under length limits
+SALESFORCE_SOQL_ID_BATCH_SIZE = 200
+
+# Full token endpoints for the login hosts (token requests never go to the instance URL)
+SALESFORCE_TOKEN_ENDPOINTS = {
+    SALESFORCE_PRODUCTION_URL: f"{SALESFORCE_PRODUCTION_URL}{SALESFORCE_TOKEN_URL}",
+    SALESFORCE_SANDBOX_URL: f"{SALESFORCE_SANDBOX_URL}{SALESFORCE_TOKEN_URL}",
+}
 
 # Google OAuth URLs
 GOOGLE_OAUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
@@ -29,77 +44,150 @@ LUCIDCHART_OAUTH_URL = "https://lucid.app/oauth2/authorize"
 LUCIDCHART_TOKEN_URL = "https://lucid.app/oauth2/token"
 LUCIDCHART_API_BASE = "https://api.lucid.co/v1"
 LUCIDCHART_DOCUMENTS_URL = f"{LUCIDCHART_API_BASE}/documents"
+# Upper bound on document list pages followed for one listing
+LUCIDCHART_MAX_DOCUMENT_PAGES = 20
 
 # File type constants
-FILE_TYPE_METADATA = "metadata"
-FILE_TYPE_LUCID = "lucid"
+FILE_TYPE_METADATA: Final[str] = sys.intern("metadata")
+FILE_TYPE_LUCID: Final[str] = sys.intern("lucid")
 
 # Process status constants
-STATUS_STARTING = "starting"
-STATUS_RUNNING = "running"
-STATUS_COMPLETED = "completed"
-STATUS_ERROR = "error"
-STATUS_TERMINATED = "terminated"
-STATUS_TERMINATING = "terminating"
+STATUS_STARTING: Final[str] = sys.intern("starting")
+STATUS_RUNNING: Final[str] = sys.intern("running")
+STATUS_COMPLETED: Final[str] = sys.intern("completed")
+STATUS_ERROR: Final[str] = sys.intern("error")
+STATUS_TERMINATED: Final[str] = sys.intern("terminated")
+STATUS_TERMINATING: Final[str] = sys.intern("terminating")
+
+
+# Default instance URL per DEPLOYMENT_ENV (anything else falls back to SALESFORCE_DEV_URL)
+_DEFAULT_INSTANCE_URLS = {
+    "PROD": SALESFORCE_PRODUCTION_URL,
+    "PRODUCTION": SALESFORCE_PRODUCTION_URL,
+    "STG": SALESFORCE_SANDBOX_URL,
+    "STAGING": SALESFORCE_SANDBOX_URL,
+}
+
+# Accepted spellings of a true boolean setting (compared lower-cased)
+_TRUTHY: frozenset = frozenset({"1", "true", "yes", "on", "t", "y"})
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean setting."""
+    return value.strip().lower() in _TRUTHY
+
 
+def _parse_int(value: str) -> int:
+    """Parse a non-negative integer setting, raising ValueError for malformed values."""
+    value = value.strip()
+    if not value.isdecimal():
+        raise ValueError(f"Not a non-negative integer: {value!r}")
+    return int(value)
 
+
+def _keep_str(value: str) -> str:
+    """Return a string setting unchanged."""
+    return value
+
+
+# Converters for settings values, keyed by the field's annotation (kept as a
+# string by postponed evaluation) and called with the raw value; a ValueError
+# keeps the field's default. Every field is read from the environment variable
+# named after it in upper case.
+_ENV_PARSERS = {
+    "bool": _parse_bool,
+    "int": _parse_int,
+}
+
+
+@dataclass(slots=True, frozen=True)
 class Settings:
     """Application settings loaded from environment variables."""
     
-    def __init__(self):
-        """Initialize settings from environment variables."""
-        # Application settings
-        self.app_name: str = os.getenv("APP_NAME", "Salesforce Data Model Exporter")
-        self.debug: bool = os.getenv("DEBUG", "False").lower() == "true"
-        self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
-        
-        # Server settings
-        self.host: str = os.getenv("HOST", "0.0.0.0")
-        self.port: int = int(os.getenv("PORT", "8000"))
-        
-        # Google Drive OAuth2 settings
-        self.google_client_id: Optional[str] = os.getenv("GOOGLE_CLIENT_ID")
-        self.google_client_secret: Optional[str] = os.getenv("GOOGLE_CLIENT_SECRET")
-        self.google_redirect_uri: Optional[str] = os.getenv("GOOGLE_REDIRECT_URI")
-        
-        # Lucidchart OAuth2 settings
-        self.lucidchart_client_id: Optional[str] = os.getenv("LUCIDCHART_CLIENT_ID")
-        self.lucidchart_client_secret: Optional[str] = os.getenv("LUCIDCHART_CLIENT_SECRET")
-        self.lucidchart_redirect_uri: Optional[str] = os.getenv("LUCIDCHART_REDIRECT_URI")
+    # Application settings
+    app_name: str = "Salesforce Data Model Exporter"
+    debug: bool = False
+    log_level: str = "INFO"
+    
+    # Server settings
+    host: str = "0.0.0.0"
+    port: int = 8000
+    
+    # Google Drive OAuth2 settings
+    google_client_id: Optional[str] = None
+    google_client_secret: Optional[str] = None
+    google_redirect_uri: Optional[str] = None
+    
+    # Lucidchart OAuth2 settings
+    lucidchart_client_id: Optional[str] = None
+    lucidchart_client_secret: Optional[str] = None
+    lucidchart_redirect_uri: Optional[str] = None
+    
+    # Salesforce API settings
+    salesforce_api_version: str = "v53.0"
+    salesforce_instance_url: str = SALESFORCE_DEV_URL
+    
+    # Salesforce OAuth2 credentials (optional - can be pre-filled in form)
+    # If not set, users must enter them in the web form each time
+    salesforce_client_id: Optional[str] = None
+    salesforce_client_secret: Optional[str] = None
+    salesforce_redirect_uri: Optional[str] = None
+    
+    # Number of composite describe requests (up to 25 objects each) issued
+    # concurrently during extraction
+    salesforce_describe_concurrency: int = 8
+    
+    # Seconds a password-flow access token is reused for the same credentials
+    salesforce_token_cache_seconds: int = 900
+    
+    # Seconds an object's describe result is reused for the same org and token
+    salesforce_describe_cache_seconds: int = 300
+    
+    # File storage settings
+    max_log_entries: int = 1000
+    input_dir: str = "input"
+    output_dir: str = "output"
+    
+    # Background processing settings
+    max_concurrent_extractions: int = 4
+    max_concurrent_uploads: int = 8
+    process_retention_seconds: int = 3600
+    
+    @classmethod
+    def from_env(cls) -> Settings:
+        """Build settings from environment variables."""
+        import os
         
-        # Salesforce API settings
-        self.salesforce_api_version: str = os.getenv("SALESFORCE_API_VERSION", "v53.0")
+        # Snapshot the environment once instead of going through os.environ per field
+        env = dict(os.environ)
         
         # Instance URL - environment-specific defaults
         # Can be overridden via SALESFORCE_INSTANCE_URL env var
-        deployment_env = os.getenv("DEPLOYMENT_ENV", "DEV").upper()
+        deployment_env = env.get("DEPLOYMENT_ENV", "DEV").upper()
         
-        if deployment_env in ("PROD", "PRODUCTION"):
-            default_instance_url = SALESFORCE_PRODUCTION_URL
-        elif deployment_env in ("STG", "STAGING"):
-            default_instance_url = SALESFORCE_SANDBOX_URL
-        else:
-            # Default for DEV or unspecified - use your specific org URL
-            default_instance_url = "https://cloudblazer2-dev-ed.develop.my.salesforce.com"
+        default_instance_url = _DEFAULT_INSTANCE_URLS.get(deployment_env, SALESFORCE_DEV_URL)
         
-        self.salesforce_instance_url: str = os.getenv(
-            "SALESFORCE_INSTANCE_URL",
-            default_instance_url
-        )
+        kwargs = {}
+        for settings_field in fields(cls):
+            env_name = settings_field.name.upper()
+            if env_name not in env:
+                continue
+            try:
+                kwargs[settings_field.name] = _ENV_PARSERS.get(settings_field.type, _keep_str)(env[env_name])
+            except ValueError:
+                # Malformed values keep the field's default
+                pass
+        kwargs.setdefault("salesforce_instance_url", default_instance_url)
         
-        # Salesforce OAuth2 credentials (optional - can be pre-filled in form)
-        # If not set, users must enter them in the web form each time
-        self.salesforce_client_id: Optional[str] = os.getenv("SALESFORCE_CLIENT_ID")
-        self.salesforce_client_secret: Optional[str] = os.getenv("SALESFORCE_CLIENT_SECRET")
-        self.salesforce_redirect_uri: Optional[str] = os.getenv("SALESFORCE_REDIRECT_URI")
-        
-        # File storage settings
-        self.max_log_entries: int = int(os.getenv("MAX_LOG_ENTRIES", "1000"))
-        self.input_dir: str = os.getenv("INPUT_DIR", "input")
-        self.output_dir: str = os.getenv("OUTPUT_DIR", "output")
+        return cls(**kwargs)
+
+
+_settings_singleton: Optional[Settings] = None
 
 
-@lru_cache()
 def get_settings() -> Settings:
     """Get cached settings instance."""
-    return Settings()
+    global _settings_singleton
+    if _settings_singleton is None:
+        _settings_singleton = Settings.from_env()
+    return _settings_singleton
@@ -3,55 +3,55 @@
 
 class SalesforceAPIError(Exception):
     """Base exception for Salesforce API errors."""
-    pass
+    __slots__ = ()
 
 
 class AuthenticationError(SalesforceAPIError):
     """Raised when Salesforce authentication fails."""
-    pass
+    __slots__ = ()
 
 
 class APIRequestError(SalesforceAPIError):
     """Raised when a Salesforce API request fails."""
-    pass
+    __slots__ = ()
 
 
-class ProcessNotFoundError(Exception):
+class ProcessNotFoundError(KeyError):
     """Raised when a process ID is not found."""
-    pass
+    __slots__ = ()
 
 
-class FileNotFoundError(Exception):
-    """Raised when a file is not found."""
-    pass
+class AppFileNotFoundError(FileNotFoundError):
+    """Raised when an application file is not found."""
+    __slots__ = ()
 
 
 class GoogleDriveError(Exception):
     """Base exception for Google Drive errors."""
-    pass
+    __slots__ = ()
 
 
 class GoogleDriveAuthError(GoogleDriveError):
     """Raised when Google Drive authentication fails."""
-    pass
+    __slots__ = ()
 
 
 class GoogleDriveUploadError(GoogleDriveError):
     """Raised when Google Drive upload fails."""
-    pass
+    __slots__ = ()
 
 
 class LucidchartError(Exception):
     """Base exception for Lucidchart errors."""
-    pass
+    __slots__ = ()
 
 
 class LucidchartAuthError(LucidchartError):
     """Raised when Lucidchart authentication fails."""
-    pass
+    __slots__ = ()
 
 
 class LucidchartAPIError(LucidchartError):
     """Raised when Lucidchart API request fails."""
-    pass
+    __slots__ = ()
 
@@ -1,46 +1,91 @@
 """Main FastAPI application entry point."""
+import asyncio
+import html
 import logging
 import os
-import uuid
-from datetime import datetime
-from typing import Dict, Optional
+import string
+import threading
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from secrets import token_urlsafe
+from types import MappingProxyType
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
+from cachetools import TTLCache
 from fastapi import FastAPI, Request, Form, BackgroundTasks, HTTPException, Body
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from jinja2 import Environment, FileSystemLoader
+from fastapi.concurrency import run_in_threadpool
+from starlette.convertors import register_url_convertor
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
-from config import get_settings, FILE_TYPE_METADATA, FILE_TYPE_LUCID
+from config import (
+    get_settings,
+    SALESFORCE_DEV_URL,
+    SALESFORCE_PRODUCTION_URL,
+    SALESFORCE_SANDBOX_URL,
+    FILE_TYPE_METADATA,
+    FILE_TYPE_LUCID,
+    STATUS_RUNNING,
+    STATUS_COMPLETED,
+    STATUS_ERROR,
+    STATUS_TERMINATED,
+    STATUS_TERMINATING
+)
 from exceptions import (
-    ProcessNotFoundError,
-    FileNotFoundError,
+    AppFileNotFoundError,
     GoogleDriveAuthError,
     GoogleDriveUploadError,
     AuthenticationError,
-    APIRequestError
+    LucidchartAuthError,
+    LucidchartAPIError
 )
-from models import ProcessData, SalesforceCredentials
+from models import SalesforceCredentials, SalesforceObject, StoredOAuthTokens
 from services.salesforce_service import SalesforceService
-from services.file_service import FileService
+from services.file_service import FileService, METADATA_FILENAME
 from services.google_drive_service import GoogleDriveService
-from services.lucidchart_service import (
-    LucidchartService,
-    LucidchartAuthError,
-    LucidchartAPIError
+from services.lucidchart_service import LucidchartService
+from services.process_registry import ProcessRegistry
+from utils import (
+    FileTypeConvertor,
+    ORJSONResponse,
+    ProcessIdConvertor,
+    RangeAwareGZipMiddleware,
+    get_redirect_uri,
+    create_process_data,
+    is_namespace_prefix,
+    token_digest
 )
-from utils import get_redirect_uri, create_process_data, validate_file_type
+
+settings = get_settings()
 
 # Configure logging
 logging.basicConfig(
-    level=get_settings().log_level,
+    level=settings.log_level,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Stop accepting extractions, drop queued ones and close HTTP sessions on shutdown."""
+    yield
+    extraction_pool.shutdown(wait=False, cancel_futures=True)
+    for service in (salesforce_service, google_drive_service, lucidchart_service):
+        service.session.close()
+    salesforce_service.composite_session.close()
+
+
+# Path convertors for process routes; requests with malformed process IDs or
+# unknown file types fail route matching instead of reaching the handlers
+register_url_convertor("process_id", ProcessIdConvertor())
+register_url_convertor("file_type", FileTypeConvertor())
+
 # Initialize FastAPI app
-settings = get_settings()
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Add CORS middleware for production
 app.add_middleware(
@@ -51,19 +96,134 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON, HTML and CSV responses (log polls, app lists, downloads) for
+# clients that accept gzip
+app.add_middleware(RangeAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Setup templates and static files
-templates = Environment(loader=FileSystemLoader("templates"))
+# Page templates are compiled once at startup (with a bytecode cache shared across
+# workers) instead of being looked up and stat()ed on every request
+templates = Environment(
+    loader=FileSystemLoader("templates"),
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache()
+)
+page_templates = {
+    name: templates.get_template(name)
+    for name in (
+        "home.html", "features.html", "exporter.html", "lucidchart.html", "select_app.html",
+        "lucidchart_auth_success.html", "lucidchart_auth_error.html"
+    )
+}
+# Pages with no per-request context are rendered once and served as bytes
+static_pages = {
+    name: page_templates[name].render().encode("utf-8")
+    for name in ("home.html", "features.html", "lucidchart.html")
+}
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# Environment-specific instance URLs for the exporter page, built once and
+# shared read-only across requests
+ENV_URLS = MappingProxyType({
+    "DEV": SALESFORCE_DEV_URL,
+    "STG": SALESFORCE_SANDBOX_URL,
+    "PROD": SALESFORCE_PRODUCTION_URL
+})
+
 # Initialize services
 salesforce_service = SalesforceService()
 file_service = FileService()
 google_drive_service = GoogleDriveService()
 lucidchart_service = LucidchartService()
 
-# Store running processes and their logs
-processes: Dict[str, ProcessData] = {}
-running_flags: Dict[str, bool] = {}
+# Store running processes and their logs; each process's metadata CSV is
+# deleted along with it (Lucid CSVs are named by date and app, and may be
+# shared by several processes, so they are kept)
+processes = ProcessRegistry(
+    max_age=settings.process_retention_seconds,
+    on_evict=lambda process_data: file_service.remove_file(process_data.metadata_file)
+)
+# One event per queued or running extraction; set while it should keep going,
+# cleared by terminate_process
+running_events: Dict[str, threading.Event] = {}
+
+# Pending OAuth states (keyed by state) and authenticated OAuth sessions
+# (keyed by session ID), kept apart from processes and evicted after a TTL
+# so abandoned flows do not accumulate
+oauth_states: TTLCache = TTLCache(maxsize=10_000, ttl=600)
+oauth_sessions: TTLCache = TTLCache(maxsize=10_000, ttl=900)
+
+# Google Drive and Lucidchart refresh tokens per (provider, token session ID).
+# The session ID lives in an HttpOnly cookie set by the OAuth callback, so the
+# access token alone (e.g. an expired or leaked one) cannot be refreshed. The
+# browser keeps sending its original token; the server swaps in a refreshed
+# one once it expires, so users are not sent through the OAuth flow again
+# every hour
+OAUTH_TOKEN_TTL_SECONDS = 30 * 24 * 3600
+oauth_tokens: TTLCache = TTLCache(maxsize=10_000, ttl=OAUTH_TOKEN_TTL_SECONDS)
+
+# Object lists per (instance URL, access token digest); extraction threads share
+# the cache, so access goes through a lock
+objects_cache: TTLCache = TTLCache(maxsize=128, ttl=300)
+objects_cache_lock = threading.Lock()
+
+# Decorated Lucidchart document listings per access token digest; only touched
+# from the event loop, so no lock is needed
+documents_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
+# Downloadable file types -> (path attribute, file name attribute, fallback file name) of the process data
+DOWNLOAD_FILES: Dict[str, Tuple[str, str, str]] = {
+    FILE_TYPE_METADATA: ('metadata_file', 'metadata_filename', METADATA_FILENAME),
+    FILE_TYPE_LUCID: ('lucid_file', 'lucid_filename', "salesforce_metadata_lucid.csv"),
+}
+
+# Metadata extractions run on a dedicated, bounded worker pool rather than
+# Starlette background tasks, keeping the request threadpool free
+extraction_pool = ThreadPoolExecutor(
+    max_workers=settings.max_concurrent_extractions,
+    thread_name_prefix="sfdc-extract"
+)
+extraction_futures: Dict[str, Future] = {}
+
+# Caps concurrent Drive uploads and Lucidchart imports, so a burst of exports
+# cannot take over the shared threadpool that the other blocking calls use
+upload_slots = asyncio.Semaphore(settings.max_concurrent_uploads)
+
+# In-flight OAuth token requests keyed by authorization code or refresh token,
+# so a double-clicked callback or concurrent uploads near token expiry wait for
+# the first request instead of spending the same grant twice
+token_requests: Dict[str, asyncio.Task] = {}
+
+
+def submit_extraction(process_id: str, task: Callable[..., None], *args) -> None:
+    """
+    Queue a metadata extraction task on the extraction pool.
+    
+    The termination event is registered before the task is queued, so a
+    terminate request always finds it, even while the task is still waiting
+    for a worker or just starting.
+    
+    Args:
+        process_id: Process identifier
+        task: Background task function to run
+        *args: Arguments passed to the task after the process ID
+    """
+    running = threading.Event()
+    running.set()
+    running_events[process_id] = running
+    
+    def forget_extraction(_: Future) -> None:
+        extraction_futures.pop(process_id, None)
+        running_events.pop(process_id, None)
+    
+    try:
+        future = extraction_pool.submit(task, process_id, *args)
+    except RuntimeError:
+        # The pool is shutting down
+        running_events.pop(process_id, None)
+        raise
+    extraction_futures[process_id] = future
+    future.add_done_callback(forget_extraction)
 
 
 def add_log(process_id: str, message: str) -> None:
@@ -75,11 +235,8 @@ def add_log(process_id: str, message: str) -> None:
         message: Log message to add
     """
     if process_id in processes:
-        processes[process_id]['logs'].append(message)
-        # Keep only last N log entries
-        max_entries = settings.max_log_entries
-        if len(processes[process_id]['logs']) > max_entries:
-            processes[process_id]['logs'] = processes[process_id]['logs'][-max_entries:]
+        # Logs are a deque bounded to the last max_log_entries messages
+        processes[process_id].logs.append(message)
 
 
 def run_process_task(
@@ -93,10 +250,7 @@ def run_process_task(
         process_id: Process identifier
         credentials: Salesforce authentication credentials
     """
-    from config import STATUS_RUNNING, STATUS_COMPLETED, STATUS_ERROR, STATUS_TERMINATED
-    
-    running_flags[process_id] = True
-    processes[process_id]['status'] = STATUS_RUNNING
+    processes[process_id].status = STATUS_RUNNING
     
     try:
         add_log(process_id, "Starting metadata retrieval process...")
@@ -116,17 +270,15 @@ def run_process_task(
             raise  # Re-raise to be caught by outer exception handler
         
         # Continue with metadata extraction
-        namespace_prefix = processes[process_id].get('namespace_prefix')
+        namespace_prefix = processes[process_id].namespace_prefix
         _run_metadata_extraction(process_id, access_token, instance_url, namespace_prefix)
         
     except Exception as e:
         error_msg = f"An error occurred: {str(e)}"
         logger.exception(f"Error in process {process_id}: {e}")
         add_log(process_id, error_msg)
-        processes[process_id]['status'] = STATUS_ERROR
-        processes[process_id]['error'] = str(e)
-    finally:
-        running_flags[process_id] = False
+        processes[process_id].status = STATUS_ERROR
+        processes[process_id].error = str(e)
 
 
 def run_process_task_with_token(
@@ -142,23 +294,149 @@ def run_process_task_with_token(
         access_token: Salesforce OAuth2 access token
         instance_url: Salesforce instance URL
     """
-    from config import STATUS_RUNNING, STATUS_COMPLETED, STATUS_ERROR, STATUS_TERMINATED
-    
-    running_flags[process_id] = True
-    processes[process_id]['status'] = STATUS_RUNNING
+    processes[process_id].status = STATUS_RUNNING
     
     try:
         add_log(process_id, "Starting metadata retrieval process with OAuth2 token...")
-        namespace_prefix = processes[process_id].get('namespace_prefix')
+        namespace_prefix = processes[process_id].namespace_prefix
         _run_metadata_extraction(process_id, access_token, instance_url, namespace_prefix)
     except Exception as e:
         error_msg = f"An error occurred: {str(e)}"
         logger.exception(f"Error in process {process_id}: {e}")
         add_log(process_id, error_msg)
-        processes[process_id]['status'] = STATUS_ERROR
-        processes[process_id]['error'] = str(e)
-    finally:
-        running_flags[process_id] = False
+        processes[process_id].status = STATUS_ERROR
+        processes[process_id].error = str(e)
+
+
+async def request_token_once(grant: str, request: Callable[..., Dict], *args) -> Dict:
+    """
+    Run an OAuth token request, sharing the result with concurrent callers for the same grant.
+    
+    Args:
+        grant: Authorization code or refresh token being exchanged
+        request: Blocking service method performing the token request
+        *args: Arguments passed to the service method
+        
+    Returns:
+        Token response from the request
+    """
+    task = token_requests.get(grant)
+    if task is None:
+        task = asyncio.ensure_future(run_in_threadpool(request, *args))
+        token_requests[grant] = task
+        task.add_done_callback(lambda _: token_requests.pop(grant, None))
+    # Shield the shared request so one caller disconnecting does not cancel it for the others
+    return await asyncio.shield(task)
+
+
+def oauth_token_cookie(provider: str) -> str:
+    """
+    Name the cookie holding a provider's token session ID.
+    
+    Args:
+        provider: Integration name (google_drive or lucidchart)
+        
+    Returns:
+        Cookie name
+    """
+    return f"{provider}_token_session"
+
+
+def remember_oauth_tokens(provider: str, tokens: Dict, request: Request, response: Response) -> None:
+    """
+    Keep the refresh token from a code exchange so the access token can be renewed server-side.
+    
+    The tokens are stored under a new session ID that is only handed to the
+    browser in an HttpOnly cookie, and refreshing later requires both the
+    cookie and the access token it was issued with.
+    
+    Args:
+        provider: Integration name (google_drive or lucidchart)
+        tokens: Token response from the code exchange
+        request: Callback request, used to tell whether the cookie must be secure
+        response: Callback response to set the session cookie on
+    """
+    access_token = tokens.get("access_token")
+    refresh_token = tokens.get("refresh_token")
+    if not access_token or not refresh_token:
+        return
+    session_id = token_urlsafe(32)
+    oauth_tokens[(provider, session_id)] = StoredOAuthTokens(
+        browser_token_digest=token_digest(access_token),
+        access_token=access_token,
+        refresh_token=refresh_token,
+        expires_at=time.time() + int(tokens.get("expires_in", 3600))
+    )
+    response.set_cookie(
+        oauth_token_cookie(provider),
+        session_id,
+        max_age=OAUTH_TOKEN_TTL_SECONDS,
+        httponly=True,
+        secure=request.url.scheme == "https",
+        samesite="lax"
+    )
+
+
+async def current_access_token(
+    provider: str,
+    access_token: str,
+    request: Request,
+    refresh: Callable[[str], Dict]
+) -> str:
+    """
+    Resolve a browser-held access token to a usable one, refreshing it shortly before expiry.
+    
+    Args:
+        provider: Integration name (google_drive or lucidchart)
+        access_token: Access token sent by the browser
+        request: Incoming request carrying the token session cookie
+        refresh: Blocking service method exchanging a refresh token for new tokens
+        
+    Returns:
+        Access token to call the provider with
+    """
+    session_id = request.cookies.get(oauth_token_cookie(provider))
+    stored = oauth_tokens.get((provider, session_id)) if session_id else None
+    if stored is None or stored['browser_token_digest'] != token_digest(access_token):
+        return access_token
+    if time.time() < stored['expires_at'] - 60:
+        return stored['access_token']
+    
+    try:
+        tokens = await request_token_once(stored['refresh_token'], refresh, stored['refresh_token'])
+    except (GoogleDriveAuthError, LucidchartAuthError) as e:
+        # Fall back to the current token; the provider reports if it is no longer valid
+        logger.warning(f"Could not refresh {provider} access token: {e}")
+        return stored['access_token']
+    
+    stored['access_token'] = tokens['access_token']
+    stored['refresh_token'] = tokens.get('refresh_token') or stored['refresh_token']
+    stored['expires_at'] = time.time() + int(tokens.get('expires_in', 3600))
+    return stored['access_token']
+
+
+def get_org_objects(access_token: str, instance_url: str) -> List[SalesforceObject]:
+    """
+    Retrieve the org's object list, reusing a recent result for the same org and token.
+    
+    Repeated extractions (e.g. trying different app filters in one session)
+    skip the sobjects round-trip while the cached list is fresh.
+    
+    Args:
+        access_token: Salesforce OAuth2 access token
+        instance_url: Salesforce instance URL
+        
+    Returns:
+        List of queryable Salesforce objects
+    """
+    cache_key = (instance_url, token_digest(access_token))
+    with objects_cache_lock:
+        objects = objects_cache.get(cache_key)
+    if objects is None:
+        objects = salesforce_service.get_all_objects(access_token, instance_url)
+        with objects_cache_lock:
+            objects_cache[cache_key] = objects
+    return objects
 
 
 def _run_metadata_extraction(process_id: str, access_token: str, instance_url: str, namespace_prefix: Optional[str] = None) -> None:
@@ -171,34 +449,25 @@ def _run_metadata_extraction(process_id: str, access_token: str, instance_url: s
         instance_url: Salesforce instance URL
         namespace_prefix: Optional namespace prefix to filter objects by app
     """
-    from config import STATUS_COMPLETED, STATUS_ERROR, STATUS_TERMINATED
-    
     # Retrieve all objects
-    objects = salesforce_service.get_all_objects(access_token, instance_url)
+    objects = get_org_objects(access_token, instance_url)
     add_log(process_id, f"Retrieved {len(objects)} objects.")
     
     if namespace_prefix and namespace_prefix != 'all':
         # Check if it's a namespace or app ID
-        is_namespace = (
-            len(namespace_prefix) < 20 and
-            not namespace_prefix.startswith('0') and
-            '__' not in namespace_prefix
-        )
-        if is_namespace:
+        if is_namespace_prefix(namespace_prefix):
             add_log(process_id, f"Filtering objects by app namespace: {namespace_prefix}")
         else:
             add_log(process_id, f"Selected app (ID: {namespace_prefix[:20]}...) - extracting all objects (app has no namespace)")
     
-    # Extract metadata
-    def should_continue() -> bool:
-        """Check if processing should continue."""
-        return running_flags.get(process_id, False)
+    # Extract metadata, stopping once terminate_process clears the event
+    should_continue = running_events[process_id].is_set
     
-    def log_progress(message: str) -> None:
-        """Log progress messages to the UI."""
-        add_log(process_id, message)
+    # Log progress messages to the UI by appending straight to this process's
+    # log deque, skipping add_log's registry lookups on every object
+    log_progress = processes[process_id].logs.append
     
-    metadata_rows = salesforce_service.extract_metadata(
+    metadata_rows = salesforce_service.iter_metadata_rows(
         access_token,
         instance_url,
         objects,
@@ -207,75 +476,179 @@ def _run_metadata_extraction(process_id: str, access_token: str, instance_url: s
         namespace_prefix=namespace_prefix
     )
     
-    if not should_continue():
+    # Save this process's metadata CSV, writing rows as each object's describe
+    # completes; the partial file is discarded if the process is terminated
+    metadata_file_path = file_service.save_metadata_csv(metadata_rows, process_id, should_continue)
+    
+    if metadata_file_path is None:
+        # Finish the stopped extraction now, so its summary is logged first
+        metadata_rows.close()
         add_log(process_id, "Process terminated by user.")
-        processes[process_id]['status'] = STATUS_TERMINATED
+        processes[process_id].status = STATUS_TERMINATED
         return
     
-    # Save metadata CSV
-    metadata_file_path = file_service.save_metadata_csv(metadata_rows)
     add_log(process_id, f"Metadata saved to {metadata_file_path}")
     
     # Get app name for file naming
-    app_name = processes[process_id].get('app_name')
+    app_name = processes[process_id].app_name
     
     # Generate Lucidchart CSV with app name
     lucid_file_path = file_service.generate_lucid_csv(metadata_file_path, app_name=app_name)
     
-    # Store file paths
-    processes[process_id]['metadata_file'] = metadata_file_path
-    processes[process_id]['lucid_file'] = lucid_file_path
+    # Store file paths, and their display names once so status polls and
+    # downloads do not recompute them
+    process_data = processes[process_id]
+    process_data.metadata_file = metadata_file_path
+    process_data.metadata_filename = METADATA_FILENAME
+    process_data.lucid_file = lucid_file_path
+    process_data.lucid_filename = os.path.basename(lucid_file_path)
     
     add_log(process_id, "Metadata retrieval completed successfully!")
-    processes[process_id]['status'] = STATUS_COMPLETED
+    processes[process_id].status = STATUS_COMPLETED
+
+
+# Salesforce OAuth callback error pages, built once at import
+_OAUTH_ERROR_PAGE = string.Template("""
+        <html>
+        <head>
+            <title>Authentication Failed</title>
+            <style>
+                body { font-family: Arial, sans-serif; padding: 40px; max-width: 800px; margin: 0 auto; }
+                .error { color: #d32f2f; background: #ffebee; padding: 20px; border-radius: 5px; }
+                code { background: #f5f5f5; padding: 2px 6px; border-radius: 3px; }
+            </style>
+        </head>
+        <body>
+            <div class="error">
+                <h2>Salesforce Authentication Failed</h2>
+                <p><strong>Error:</strong> $error_message</p>
+                <p><strong>Details:</strong> $error_description</p>
+                $help_text
+                <p style="margin-top: 20px;"><a href="/exporter" style="color: #1976d2; text-decoration: none;">← Return to Exporter</a></p>
+            </div>
+        </body>
+        </html>
+        """)
+
+_REDIRECT_URI_MISMATCH_HELP = string.Template("""
+            <div style="margin-top: 20px; padding: 15px; background: #fff3cd; border: 1px solid #ffc107; border-radius: 5px; text-align: left;">
+                <h3 style="margin-top: 0;">How to Fix:</h3>
+                <ol>
+                    <li>Go to Salesforce Setup → External Client Apps → Your External Client App</li>
+                    <li>Click "Manager" → "OAuth Settings"</li>
+                    <li>In the "OAuth Settings" section, add the following Callback URL:</li>
+                    <li style="margin-left: 20px; font-family: monospace; background: #f5f5f5; padding: 5px;">
+                        $redirect_uri
+                    </li>
+                    <li>Click "Save"</li>
+                    <li>Wait 2-10 minutes for changes to take effect</li>
+                </ol>
+                <p><strong>Note:</strong> For local development, use: <code>http://localhost:8000/salesforce-callback</code></p>
+                <p><strong>For Heroku:</strong> Use your Heroku app URL: <code>https://your-app-name.herokuapp.com/salesforce-callback</code></p>
+            </div>
+            """)
+
+_PKCE_REQUIRED_HELP = """
+            <div style="margin-top: 20px; padding: 15px; background: #fff3cd; border: 1px solid #ffc107; border-radius: 5px; text-align: left;">
+                <h3 style="margin-top: 0;">How to Fix: Disable PKCE Requirement</h3>
+                <p style="margin-bottom: 10px;"><strong>Your External Client App requires PKCE, but this application doesn't use PKCE.</strong></p>
+                <ol>
+                    <li>Go to Salesforce Setup → External Client Apps → Your External Client App</li>
+                    <li>Click "Manager" → "OAuth Settings" (or "Edit Policies")</li>
+                    <li>Find the setting: <strong>"Require PKCE for Authorization Code Flow"</strong></li>
+                    <li><strong>Uncheck/Disable</strong> this option</li>
+                    <li>Click "Save"</li>
+                    <li>Wait 2-10 minutes for changes to take effect</li>
+                </ol>
+                <p style="margin-top: 10px;"><strong>Alternative:</strong> If you cannot disable PKCE, you'll need to use the Password Flow instead of OAuth2 Flow (if MFA is not enabled).</p>
+            </div>
+            """
+
+_MISSING_CODE_PAGE = b"""
+        <html>
+        <head>
+            <title>Authentication Failed</title>
+            <style>
+                body { font-family: Arial, sans-serif; padding: 40px; text-align: center; }
+                .error { color: #d32f2f; background: #ffebee; padding: 20px; border-radius: 5px; }
+            </style>
+        </head>
+        <body>
+            <div class="error">
+                <h2>Salesforce Authentication Failed</h2>
+                <p>Missing authorization code or state parameter.</p>
+                <p><a href="/exporter">Return to Exporter</a></p>
+            </div>
+        </body>
+        </html>
+        """
+
+# Static pages are stored pre-encoded so they are sent without per-request encoding
+_MISSING_SESSION_PAGE = b"<html><body><h2>Error: Missing session ID</h2><p><a href='/exporter'>Return to Exporter</a></p></body></html>"
+_EXPIRED_SESSION_PAGE = b"<html><body><h2>Error: Invalid or expired session</h2><p><a href='/exporter'>Return to Exporter</a></p></body></html>"
+_GOOGLE_MISSING_CODE_PAGE = b"<html><body><h1>No authorization code received</h1><script>window.close();</script></body></html>"
+
+_LUCIDCHART_MISSING_CODE_PAGE = page_templates["lucidchart_auth_error.html"].render(
+    title="No Authorization Code",
+    heading="No authorization code received",
+    message="Please try again.",
+    notify_error="No authorization code received"
+).encode("utf-8")
+
+_CALLBACK_FAILURE_PAGE = string.Template("""
+        <html>
+        <head>
+            <title>Authentication Failed</title>
+            <style>
+                body { font-family: Arial, sans-serif; padding: 40px; text-align: center; }
+                .error { color: #d32f2f; background: #ffebee; padding: 20px; border-radius: 5px; }
+            </style>
+        </head>
+        <body>
+            <div class="error">
+                <h2>Salesforce Authentication Failed</h2>
+                <p>Error: $error</p>
+                <p><a href="/exporter">Return to Exporter</a></p>
+            </div>
+        </body>
+        </html>
+        """)
 
 
 # Route handlers
 @app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request) -> HTMLResponse:
+async def read_root() -> HTMLResponse:
     """Render home page."""
-    template = templates.get_template("home.html")
-    return HTMLResponse(content=template.render(request=request))
+    return HTMLResponse(content=static_pages["home.html"])
 
 
 @app.get("/features", response_class=HTMLResponse)
-async def features_page(request: Request) -> HTMLResponse:
+async def features_page() -> HTMLResponse:
     """Render features page."""
-    template = templates.get_template("features.html")
-    return HTMLResponse(content=template.render(request=request))
+    return HTMLResponse(content=static_pages["features.html"])
 
 
 @app.get("/exporter", response_class=HTMLResponse)
 async def exporter_page(request: Request) -> HTMLResponse:
     """Render data model exporter page."""
-    settings = get_settings()
-    template = templates.get_template("exporter.html")
-    
-    # Environment-specific instance URLs
-    env_urls = {
-        "DEV": "https://cloudblazer2-dev-ed.develop.my.salesforce.com",
-        "STG": "https://test.salesforce.com",
-        "PROD": "https://login.salesforce.com"
-    }
-    
+    template = page_templates["exporter.html"]
     return HTMLResponse(content=template.render(
         request=request,
         default_instance_url=settings.salesforce_instance_url,
         default_client_id=settings.salesforce_client_id or "",
         default_client_secret=settings.salesforce_client_secret or "",
-        env_urls=env_urls,
+        env_urls=ENV_URLS,
     ))
 
 
 @app.get("/lucidchart", response_class=HTMLResponse)
-async def lucidchart_page(request: Request) -> HTMLResponse:
+async def lucidchart_page() -> HTMLResponse:
     """Render Lucidchart information page."""
-    template = templates.get_template("lucidchart.html")
-    return HTMLResponse(content=template.render(request=request))
+    return HTMLResponse(content=static_pages["lucidchart.html"])
 
 
 @app.get("/salesforce-redirect-uri")
-async def get_salesforce_redirect_uri(request: Request) -> JSONResponse:
+async def get_salesforce_redirect_uri(request: Request) -> ORJSONResponse:
     """
     Get the Salesforce redirect URI that needs to be configured.
     This is a helper endpoint to show users exactly what to configure.
@@ -287,12 +660,12 @@ async def get_salesforce_redirect_uri(request: Request) -> JSONResponse:
         JSON response with the redirect URI
     """
     redirect_uri = get_redirect_uri(
-        request.base_url,
+        str(request.base_url),
         settings.salesforce_redirect_uri,
         "/salesforce-callback"
     )
     
-    return JSONResponse({
+    return ORJSONResponse({
         "redirect_uri": redirect_uri,
         "instructions": {
             "step1": "Go to Salesforce Setup → App Manager → Your Connected App",
@@ -311,7 +684,7 @@ async def salesforce_auth(
     client_secret: str,
     instance_url: str,
     state: Optional[str] = None
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Initiate Salesforce OAuth2 authentication (supports MFA).
     
@@ -339,15 +712,13 @@ async def salesforce_auth(
         
         # Generate state if not provided (store client_secret temporarily)
         if not state:
-            state = str(uuid.uuid4())
+            state = token_urlsafe(16)
         
         # Get app_namespace from query params if provided
         app_namespace = request.query_params.get('app_namespace')
         
-        # Store credentials temporarily in session (using process storage as temporary)
-        # In production, use proper session storage or Redis
-        temp_storage_key = f"oauth_{state}"
-        processes[temp_storage_key] = {
+        # Store credentials temporarily until the OAuth callback arrives
+        oauth_states[state] = {
             'client_id': client_id,
             'client_secret': client_secret,
             'instance_url': instance_url,
@@ -356,7 +727,7 @@ async def salesforce_auth(
         }
         
         redirect_uri = get_redirect_uri(
-            request.base_url,
+            str(request.base_url),
             settings.salesforce_redirect_uri,
             "/salesforce-callback"
         )
@@ -368,7 +739,7 @@ async def salesforce_auth(
         
         auth_url = salesforce_service.get_auth_url(instance_url, client_id, redirect_uri, state)
         
-        return JSONResponse({
+        return ORJSONResponse({
             "auth_url": auth_url, 
             "state": state,
             "redirect_uri": redirect_uri  # Include in response for debugging
@@ -408,157 +779,66 @@ async def salesforce_callback(
         
         if 'redirect_uri_mismatch' in error.lower():
             error_message = "Redirect URI Mismatch"
-            help_text = """
-            <div style="margin-top: 20px; padding: 15px; background: #fff3cd; border: 1px solid #ffc107; border-radius: 5px; text-align: left;">
-                <h3 style="margin-top: 0;">How to Fix:</h3>
-                <ol>
-                    <li>Go to Salesforce Setup → External Client Apps → Your External Client App</li>
-                    <li>Click "Manager" → "OAuth Settings"</li>
-                    <li>In the "OAuth Settings" section, add the following Callback URL:</li>
-                    <li style="margin-left: 20px; font-family: monospace; background: #f5f5f5; padding: 5px;">
-                        {redirect_uri}
-                    </li>
-                    <li>Click "Save"</li>
-                    <li>Wait 2-10 minutes for changes to take effect</li>
-                </ol>
-                <p><strong>Note:</strong> For local development, use: <code>http://localhost:8000/salesforce-callback</code></p>
-                <p><strong>For Heroku:</strong> Use your Heroku app URL: <code>https://your-app-name.herokuapp.com/salesforce-callback</code></p>
-            </div>
-            """
-            # Try to get the redirect URI that was used
-            try:
-                # Get from request or reconstruct
-                redirect_uri = get_redirect_uri(
-                    request.base_url,
-                    settings.salesforce_redirect_uri,
-                    "/salesforce-callback"
-                )
-                help_text = help_text.format(redirect_uri=redirect_uri)
-            except:
-                help_text = help_text.format(redirect_uri="[Check server logs for the exact redirect URI]")
+            redirect_uri = get_redirect_uri(
+                str(request.base_url),
+                settings.salesforce_redirect_uri,
+                "/salesforce-callback"
+            )
+            help_text = _REDIRECT_URI_MISMATCH_HELP.substitute(redirect_uri=html.escape(redirect_uri))
         elif 'code_challenge' in error_description.lower() or 'pkce' in error_description.lower():
             error_message = "PKCE Required"
-            help_text = """
-            <div style="margin-top: 20px; padding: 15px; background: #fff3cd; border: 1px solid #ffc107; border-radius: 5px; text-align: left;">
-                <h3 style="margin-top: 0;">How to Fix: Disable PKCE Requirement</h3>
-                <p style="margin-bottom: 10px;"><strong>Your External Client App requires PKCE, but this application doesn't use PKCE.</strong></p>
-                <ol>
-                    <li>Go to Salesforce Setup → External Client Apps → Your External Client App</li>
-                    <li>Click "Manager" → "OAuth Settings" (or "Edit Policies")</li>
-                    <li>Find the setting: <strong>"Require PKCE for Authorization Code Flow"</strong></li>
-                    <li><strong>Uncheck/Disable</strong> this option</li>
-                    <li>Click "Save"</li>
-                    <li>Wait 2-10 minutes for changes to take effect</li>
-                </ol>
-                <p style="margin-top: 10px;"><strong>Alternative:</strong> If you cannot disable PKCE, you'll need to use the Password Flow instead of OAuth2 Flow (if MFA is not enabled).</p>
-            </div>
-            """
+            help_text = _PKCE_REQUIRED_HELP
         
-        error_html = f"""
-        <html>
-        <head>
-            <title>Authentication Failed</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; padding: 40px; max-width: 800px; margin: 0 auto; }}
-                .error {{ color: #d32f2f; background: #ffebee; padding: 20px; border-radius: 5px; }}
-                code {{ background: #f5f5f5; padding: 2px 6px; border-radius: 3px; }}
-            </style>
-        </head>
-        <body>
-            <div class="error">
-                <h2>Salesforce Authentication Failed</h2>
-                <p><strong>Error:</strong> {error_message}</p>
-                <p><strong>Details:</strong> {error_description}</p>
-                {help_text}
-                <p style="margin-top: 20px;"><a href="/exporter" style="color: #1976d2; text-decoration: none;">← Return to Exporter</a></p>
-            </div>
-        </body>
-        </html>
-        """
+        error_html = _OAUTH_ERROR_PAGE.substitute(
+            error_message=html.escape(error_message),
+            error_description=html.escape(error_description),
+            help_text=help_text
+        )
         return HTMLResponse(content=error_html, status_code=400)
     
     if not code or not state:
-        error_html = """
-        <html>
-        <head>
-            <title>Authentication Failed</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; padding: 40px; text-align: center; }}
-                .error {{ color: #d32f2f; background: #ffebee; padding: 20px; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="error">
-                <h2>Salesforce Authentication Failed</h2>
-                <p>Missing authorization code or state parameter.</p>
-                <p><a href="/exporter">Return to Exporter</a></p>
-            </div>
-        </body>
-        </html>
-        """
-        return HTMLResponse(content=error_html, status_code=400)
+        return HTMLResponse(content=_MISSING_CODE_PAGE, status_code=400)
     
     try:
-        # Retrieve stored credentials
-        temp_storage_key = f"oauth_{state}"
-        if temp_storage_key not in processes:
+        # Retrieve and clear the stored credentials in one step
+        stored_data = oauth_states.pop(state, None)
+        if stored_data is None:
             raise HTTPException(status_code=400, detail="Invalid or expired OAuth state")
         
-        stored_data = processes[temp_storage_key]
         client_id = stored_data['client_id']
         client_secret = stored_data['client_secret']
         instance_url = stored_data['instance_url']
         app_namespace = stored_data.get('app_namespace')
         
-        # Clean up temporary storage
-        del processes[temp_storage_key]
-        
         # Exchange code for token
         redirect_uri = get_redirect_uri(
-            request.base_url,
+            str(request.base_url),
             settings.salesforce_redirect_uri,
             "/salesforce-callback"
         )
         
-        token_response = salesforce_service.exchange_code_for_token(
+        token_response = await run_in_threadpool(
+            salesforce_service.exchange_code_for_token,
             instance_url, client_id, client_secret, code, redirect_uri
         )
         
         access_token = token_response['access_token']
         instance_url_from_token = token_response.get('instance_url', instance_url)
         
-        # Store token temporarily for app loading (using state as key)
-        # Create a session ID for app loading
-        session_id = str(uuid.uuid4())
-        processes[f"oauth_session_{session_id}"] = {
+        # Store token temporarily for app loading; the session cache's TTL
+        # handles expiry, so no creation timestamp is kept
+        session_id = token_urlsafe(16)
+        oauth_sessions[session_id] = {
             'access_token': access_token,
             'instance_url': instance_url_from_token,
-            'status': 'authenticated',
-            'created_at': datetime.now().isoformat()
+            'status': 'authenticated'
         }
         
         # Redirect back to exporter page with session_id to load apps
         return RedirectResponse(url=f"/exporter?session_id={session_id}", status_code=303)
     except Exception as e:
         logger.error(f"Error in Salesforce OAuth callback: {e}")
-        error_html = f"""
-        <html>
-        <head>
-            <title>Authentication Failed</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; padding: 40px; text-align: center; }}
-                .error {{ color: #d32f2f; background: #ffebee; padding: 20px; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="error">
-                <h2>Salesforce Authentication Failed</h2>
-                <p>Error: {str(e)}</p>
-                <p><a href="/exporter">Return to Exporter</a></p>
-            </div>
-        </body>
-        </html>
-        """
+        error_html = _CALLBACK_FAILURE_PAGE.substitute(error=html.escape(str(e)))
         return HTMLResponse(content=error_html, status_code=500)
 
 
@@ -578,13 +858,12 @@ async def select_app_page(
         HTML response with app selection page
     """
     if not session_id:
-        return HTMLResponse(content="<html><body><h2>Error: Missing session ID</h2><p><a href='/exporter'>Return to Exporter</a></p></body></html>", status_code=400)
+        return HTMLResponse(content=_MISSING_SESSION_PAGE, status_code=400)
     
-    session_key = f"oauth_session_{session_id}"
-    if session_key not in processes:
-        return HTMLResponse(content="<html><body><h2>Error: Invalid or expired session</h2><p><a href='/exporter'>Return to Exporter</a></p></body></html>", status_code=400)
+    if session_id not in oauth_sessions:
+        return HTMLResponse(content=_EXPIRED_SESSION_PAGE, status_code=400)
     
-    template = templates.get_template("select_app.html")
+    template = page_templates["select_app.html"]
     return HTMLResponse(content=template.render(
         request=request,
         session_id=session_id
@@ -594,17 +873,15 @@ async def select_app_page(
 @app.post("/start-extraction")
 async def start_extraction(
     request: Request,
-    background_tasks: BackgroundTasks,
     session_id: str = Form(...),
     app_namespace: str = Form(...),
     app_name: str = Form("")
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Start metadata extraction after app selection.
     
     Args:
         request: FastAPI request object
-        background_tasks: Background tasks manager
         session_id: OAuth session ID
         app_namespace: Selected app namespace prefix
         app_name: Selected app name (for file naming)
@@ -612,57 +889,47 @@ async def start_extraction(
     Returns:
         JSON response with process ID
     """
-    session_key = f"oauth_session_{session_id}"
-    if session_key not in processes:
+    # Sessions are single-use; take it out of the cache as it is read
+    session_data = oauth_sessions.pop(session_id, None)
+    if session_data is None:
         raise HTTPException(status_code=400, detail="Invalid or expired session")
     
-    session_data = processes[session_key]
     access_token = session_data['access_token']
     instance_url = session_data['instance_url']
     
     # Create process
-    process_id = str(uuid.uuid4())
+    process_id = token_urlsafe(16)
     process_data = create_process_data()
     
     if app_namespace and app_namespace.strip() and app_namespace != 'all':
-        process_data['namespace_prefix'] = app_namespace.strip()
-        process_data['app_name'] = app_name.strip() if app_name else app_namespace.strip()
+        process_data.namespace_prefix = app_namespace.strip()
+        process_data.app_name = app_name.strip() if app_name else app_namespace.strip()
     else:
-        process_data['app_name'] = 'AllObjects'
+        process_data.app_name = 'AllObjects'
     
     processes[process_id] = process_data
     
-    # Clean up session
-    del processes[session_key]
+    # Queue extraction on the worker pool
+    submit_extraction(process_id, run_process_task_with_token, access_token, instance_url)
     
-    # Start background task
-    background_tasks.add_task(
-        run_process_task_with_token,
-        process_id,
-        access_token,
-        instance_url
-    )
-    
-    return JSONResponse({"process_id": process_id, "status": "started"})
+    return ORJSONResponse({"process_id": process_id, "status": "started"})
 
 
 @app.post("/start")
 async def start_process(
     request: Request,
-    background_tasks: BackgroundTasks,
     client_id: str = Form(...),
     client_secret: str = Form(...),
     username: str = Form(...),
     password: str = Form(...),
     instance_url: str = Form(...),
     app_namespace: Optional[str] = Form(None)
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Start the metadata extraction process.
     
     Args:
         request: FastAPI request object
-        background_tasks: Background tasks manager
         client_id: Salesforce client ID
         client_secret: Salesforce client secret
         username: Salesforce username
@@ -690,15 +957,15 @@ async def start_process(
     logger.info(f"Instance URL: {instance_url}")
     # Do not log client_id or client_secret for security reasons
     
-    process_id = str(uuid.uuid4())
+    process_id = token_urlsafe(16)
     process_data = create_process_data()
     if app_namespace and app_namespace.strip() and app_namespace != 'all':
-        process_data['namespace_prefix'] = app_namespace.strip()
+        process_data.namespace_prefix = app_namespace.strip()
         # Get app_name from form if provided, otherwise use namespace
         app_name = request.form.get('app_name', app_namespace.strip())
-        process_data['app_name'] = app_name
+        process_data.app_name = app_name
     else:
-        process_data['app_name'] = 'AllObjects'
+        process_data.app_name = 'AllObjects'
     processes[process_id] = process_data
     
     credentials: SalesforceCredentials = {
@@ -709,14 +976,14 @@ async def start_process(
         'instance_url': instance_url
     }
     
-    # Start background task
-    background_tasks.add_task(run_process_task, process_id, credentials)
+    # Queue extraction on the worker pool
+    submit_extraction(process_id, run_process_task, credentials)
     
-    return JSONResponse({"process_id": process_id, "status": "started"})
+    return ORJSONResponse({"process_id": process_id, "status": "started"})
 
 
-@app.post("/terminate/{process_id}")
-async def terminate_process(process_id: str) -> JSONResponse:
+@app.post("/terminate/{process_id:process_id}")
+async def terminate_process(process_id: str) -> ORJSONResponse:
     """
     Terminate a running process.
     
@@ -726,22 +993,28 @@ async def terminate_process(process_id: str) -> JSONResponse:
     Returns:
         JSON response with termination status
     """
-    from config import STATUS_TERMINATING
-    
-    if process_id not in running_flags:
+    # An extraction still waiting in the pool queue can be cancelled outright
+    future = extraction_futures.get(process_id)
+    if future is not None and future.cancel():
+        add_log(process_id, "Process cancelled before it started.")
+        processes[process_id].status = STATUS_TERMINATED
+        return ORJSONResponse({"status": "terminated"})
+    
+    running = running_events.get(process_id)
+    if running is None:
         raise HTTPException(status_code=404, detail="Process not found")
     
-    running_flags[process_id] = False
+    running.clear()
     add_log(process_id, "Terminate request received.")
-    processes[process_id]['status'] = STATUS_TERMINATING
+    processes[process_id].status = STATUS_TERMINATING
     
-    return JSONResponse({"status": "terminated"})
+    return ORJSONResponse({"status": "terminated"})
 
 
 @app.post("/authenticate-for-apps")
 async def authenticate_for_apps(
     credentials: dict = Body(...)
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Authenticate with Salesforce to get access token for loading apps (Password Flow).
     
@@ -753,8 +1026,6 @@ async def authenticate_for_apps(
         JSON response with access_token and instance_url
     """
     try:
-        from models import SalesforceCredentials
-        
         # Validate credentials
         client_id = credentials.get('client_id', '').strip()
         client_secret = credentials.get('client_secret', '').strip()
@@ -778,11 +1049,11 @@ async def authenticate_for_apps(
         }
         
         # Get access token
-        token_response = salesforce_service.get_access_token(sf_credentials)
+        token_response = await run_in_threadpool(salesforce_service.get_access_token, sf_credentials)
         access_token = token_response['access_token']
         instance_url_from_token = token_response.get('instance_url', instance_url)
         
-        return JSONResponse({
+        return ORJSONResponse({
             "access_token": access_token,
             "instance_url": instance_url_from_token
         })
@@ -799,7 +1070,7 @@ async def get_salesforce_apps(
     session_id: Optional[str] = None,
     access_token: Optional[str] = None,
     instance_url: Optional[str] = None
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Get list of installed Salesforce apps/packages.
     
@@ -815,10 +1086,9 @@ async def get_salesforce_apps(
     try:
         # If session_id provided, get token from session
         if session_id:
-            session_key = f"oauth_session_{session_id}"
-            if session_key not in processes:
+            if session_id not in oauth_sessions:
                 raise HTTPException(status_code=400, detail="Invalid or expired session")
-            session_data = processes[session_key]
+            session_data = oauth_sessions[session_id]
             access_token = session_data['access_token']
             instance_url = session_data['instance_url']
         else:
@@ -831,8 +1101,8 @@ async def get_salesforce_apps(
         if not access_token or not instance_url:
             raise HTTPException(status_code=400, detail="access_token and instance_url are required")
         
-        apps = salesforce_service.get_installed_apps(access_token, instance_url)
-        return JSONResponse({"apps": apps})
+        apps = await run_in_threadpool(salesforce_service.get_installed_apps, access_token, instance_url)
+        return ORJSONResponse({"apps": apps})
     except HTTPException:
         raise
     except Exception as e:
@@ -840,8 +1110,8 @@ async def get_salesforce_apps(
         raise HTTPException(status_code=500, detail=f"Failed to fetch apps: {str(e)}")
 
 
-@app.get("/status/{process_id}")
-async def get_status(process_id: str) -> JSONResponse:
+@app.get("/status/{process_id:process_id}")
+async def get_status(process_id: str) -> ORJSONResponse:
     """
     Get the status and logs of a process.
     
@@ -851,28 +1121,40 @@ async def get_status(process_id: str) -> JSONResponse:
     Returns:
         JSON response with process status and data
     """
-    if process_id not in processes:
+    process_data = processes.get(process_id)
+    if process_data is None:
         raise HTTPException(status_code=404, detail="Process not found")
     
-    process_data = processes[process_id].copy()
+    # Build the response from the fields the UI needs instead of copying the
+    # process data; the bounded log deque is serialized as a plain list
+    response = {
+        'status': process_data.status,
+        'logs': list(process_data.logs),
+        'created_at': process_data.created_at,
+        'error': process_data.error,
+        'app_name': process_data.app_name,
+    }
     
     # Include file information if available
-    if 'metadata_file' in process_data and process_data['metadata_file']:
-        process_data['has_metadata_file'] = True
-        process_data['metadata_filename'] = os.path.basename(process_data['metadata_file'])
+    if process_data.metadata_file:
+        response['has_metadata_file'] = True
+        response['metadata_filename'] = process_data.metadata_filename
     
-    if 'lucid_file' in process_data and process_data['lucid_file']:
-        process_data['has_lucid_file'] = True
-        process_data['lucid_filename'] = os.path.basename(process_data['lucid_file'])
+    if process_data.lucid_file:
+        response['has_lucid_file'] = True
+        response['lucid_filename'] = process_data.lucid_filename
     
-    return JSONResponse(process_data)
+    return ORJSONResponse(response)
 
 
-@app.get("/download/{process_id}/{file_type}")
+@app.get("/download/{process_id:process_id}/{file_type:file_type}")
 async def download_file(process_id: str, file_type: str) -> FileResponse:
     """
     Download the generated CSV files.
     
+    FileResponse answers Range requests itself (206 partial content, 416 for
+    unsatisfiable ranges), so interrupted downloads of large CSVs can resume.
+    
     Args:
         process_id: Process identifier
         file_type: Type of file to download (metadata or lucid)
@@ -881,22 +1163,16 @@ async def download_file(process_id: str, file_type: str) -> FileResponse:
         File response with the CSV file
         
     Raises:
-        HTTPException: If process or file not found, or invalid file type
+        HTTPException: If process or file not found
     """
-    if process_id not in processes:
+    process_data = processes.get(process_id)
+    if process_data is None:
         raise HTTPException(status_code=404, detail="Process not found")
     
-    if not validate_file_type(file_type):
-        raise HTTPException(status_code=400, detail="Invalid file type")
-    
-    process_data = processes[process_id]
-    
-    if file_type == FILE_TYPE_METADATA:
-        file_path = process_data.get('metadata_file')
-        filename = "salesforce_metadata.csv"
-    else:  # FILE_TYPE_LUCID
-        file_path = process_data.get('lucid_file')
-        filename = os.path.basename(file_path) if file_path else "salesforce_metadata_lucid.csv"
+    # The file_type path convertor only matches known types
+    path_key, filename_key, default_filename = DOWNLOAD_FILES[file_type]
+    file_path = getattr(process_data, path_key)
+    filename = getattr(process_data, filename_key) or default_filename
     
     if not file_path or not file_service.file_exists(file_path):
         raise HTTPException(status_code=404, detail="File not found")
@@ -909,7 +1185,7 @@ async def download_file(process_id: str, file_type: str) -> FileResponse:
 
 
 @app.get("/google-drive-auth")
-async def google_drive_auth(request: Request) -> JSONResponse:
+async def google_drive_auth(request: Request) -> ORJSONResponse:
     """
     Initiate Google Drive OAuth2 authentication.
     
@@ -924,22 +1200,22 @@ async def google_drive_auth(request: Request) -> JSONResponse:
     """
     try:
         redirect_uri = get_redirect_uri(
-            request.base_url,
+            str(request.base_url),
             settings.google_redirect_uri
         )
         logger.info(f"Google Drive auth requested. Redirect URI: {redirect_uri}")
         auth_url = google_drive_service.get_auth_url(redirect_uri)
         logger.info(f"Generated Google Drive auth URL: {auth_url}")
-        return JSONResponse({"auth_url": auth_url})
+        return ORJSONResponse({"auth_url": auth_url})
     except GoogleDriveAuthError as e:
         logger.error(f"Google Drive auth error: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": str(e), "detail": "Google Drive integration not configured. Please set GOOGLE_CLIENT_ID environment variable."}
         )
     except Exception as e:
         logger.error(f"Unexpected error in Google Drive auth: {e}", exc_info=True)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": str(e), "detail": "An unexpected error occurred while initiating Google Drive authentication."}
         )
@@ -969,20 +1245,17 @@ async def google_drive_callback(
         )
     
     if not code:
-        return HTMLResponse(
-            content="<html><body><h1>No authorization code received</h1>"
-                   "<script>window.close();</script></body></html>"
-        )
+        return HTMLResponse(content=_GOOGLE_MISSING_CODE_PAGE)
     
     try:
         redirect_uri = get_redirect_uri(
-            request.base_url,
+            str(request.base_url),
             settings.google_redirect_uri
         )
-        tokens = google_drive_service.exchange_code_for_token(code, redirect_uri)
+        tokens = await request_token_once(code, google_drive_service.exchange_code_for_token, code, redirect_uri)
         access_token = tokens.get("access_token")
         
-        return HTMLResponse(content=f"""
+        response = HTMLResponse(content=f"""
         <html>
         <body>
             <h1>Authentication Successful!</h1>
@@ -995,6 +1268,8 @@ async def google_drive_callback(
         </body>
         </html>
         """)
+        remember_oauth_tokens("google_drive", tokens, request, response)
+        return response
     except GoogleDriveAuthError as e:
         logger.error(f"Token exchange error: {e}")
         return HTMLResponse(
@@ -1003,8 +1278,8 @@ async def google_drive_callback(
         )
 
 
-@app.post("/upload-to-drive/{process_id}")
-async def upload_to_drive(process_id: str, request: Request) -> JSONResponse:
+@app.post("/upload-to-drive/{process_id:process_id}")
+async def upload_to_drive(process_id: str, request: Request) -> ORJSONResponse:
     """
     Upload file to Google Drive after OAuth2 authentication.
     
@@ -1018,11 +1293,11 @@ async def upload_to_drive(process_id: str, request: Request) -> JSONResponse:
     Raises:
         HTTPException: If process not found, file not found, or upload fails
     """
-    if process_id not in processes:
+    process_data = processes.get(process_id)
+    if process_data is None:
         raise HTTPException(status_code=404, detail="Process not found")
     
-    process_data = processes[process_id]
-    file_path = process_data.get('lucid_file')
+    file_path = process_data.lucid_file
     
     if not file_path or not file_service.file_exists(file_path):
         raise HTTPException(status_code=404, detail="File not found")
@@ -1041,9 +1316,14 @@ async def upload_to_drive(process_id: str, request: Request) -> JSONResponse:
             detail="No access token provided. Please authenticate first."
         )
     
+    access_token = await current_access_token(
+        "google_drive", access_token, request, google_drive_service.refresh_access_token
+    )
+    
     try:
-        result = google_drive_service.upload_file(file_path, access_token)
-        return JSONResponse({
+        async with upload_slots:
+            result = await run_in_threadpool(google_drive_service.upload_file, file_path, access_token)
+        return ORJSONResponse({
             "success": True,
             "file_id": result['file_id'],
             "web_view_link": result['web_view_link'],
@@ -1055,7 +1335,7 @@ async def upload_to_drive(process_id: str, request: Request) -> JSONResponse:
 
 
 @app.get("/lucidchart-auth")
-async def lucidchart_auth(request: Request, state: Optional[str] = None) -> JSONResponse:
+async def lucidchart_auth(request: Request, state: Optional[str] = None) -> ORJSONResponse:
     """
     Initiate Lucidchart OAuth2 authentication.
     
@@ -1071,15 +1351,15 @@ async def lucidchart_auth(request: Request, state: Optional[str] = None) -> JSON
     """
     try:
         redirect_uri = get_redirect_uri(
-            request.base_url,
+            str(request.base_url),
             settings.lucidchart_redirect_uri
         )
         auth_url = lucidchart_service.get_auth_url(redirect_uri, state)
-        return JSONResponse({"auth_url": auth_url})
+        return ORJSONResponse({"auth_url": auth_url})
     except LucidchartAuthError as e:
         logger.error(f"Lucidchart auth error: {e}")
         # Return a user-friendly error message instead of raising HTTPException
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,  # Return 200 so frontend can handle it gracefully
             content={
                 "error": str(e),
@@ -1088,7 +1368,7 @@ async def lucidchart_auth(request: Request, state: Optional[str] = None) -> JSON
         )
     except Exception as e:
         logger.error(f"Unexpected error in Lucidchart auth: {e}", exc_info=True)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "error": str(e),
@@ -1116,173 +1396,63 @@ async def lucidchart_callback(
     Returns:
         HTML response with authentication result
     """
+    lucidchart_error_page = page_templates["lucidchart_auth_error.html"]
+    
     if error:
         logger.error(f"Lucidchart OAuth error: {error}")
-        return HTMLResponse(
-            content=f"""<html>
-            <head><title>Authentication Error</title></head>
-            <body style="font-family: Arial, sans-serif; padding: 20px; text-align: center;">
-                <h1 style="color: #d32f2f;">Authentication Error</h1>
-                <p>{error}</p>
-                <p>You can close this window and try again.</p>
-                <script>
-                    try {{
-                        // Try to notify parent window
-                        if (window.opener) {{
-                            window.opener.postMessage({{type: 'lucidchart_auth_error', error: '{error}'}}, '*');
-                        }}
-                    }} catch (e) {{
-                        console.error('Error notifying parent:', e);
-                    }}
-                    setTimeout(() => window.close(), 3000);
-                </script>
-            </body>
-            </html>"""
-        )
+        return HTMLResponse(content=lucidchart_error_page.render(
+            title="Authentication Error",
+            heading="Authentication Error",
+            message=error,
+            hint="You can close this window and try again.",
+            notify_error=error
+        ))
     
     if not code:
         logger.error("No authorization code received in Lucidchart callback")
-        return HTMLResponse(
-            content="""<html>
-            <head><title>No Authorization Code</title></head>
-            <body style="font-family: Arial, sans-serif; padding: 20px; text-align: center;">
-                <h1 style="color: #d32f2f;">No authorization code received</h1>
-                <p>Please try again.</p>
-                <script>
-                    try {{
-                        if (window.opener) {{
-                            window.opener.postMessage({{type: 'lucidchart_auth_error', error: 'No authorization code received'}}, '*');
-                        }}
-                    }} catch (e) {{
-                        console.error('Error notifying parent:', e);
-                    }}
-                    setTimeout(() => window.close(), 3000);
-                </script>
-            </body>
-            </html>"""
-        )
+        return HTMLResponse(content=_LUCIDCHART_MISSING_CODE_PAGE)
     
     try:
         redirect_uri = get_redirect_uri(
-            request.base_url,
+            str(request.base_url),
             settings.lucidchart_redirect_uri
         )
-        tokens = lucidchart_service.exchange_code_for_token(code, redirect_uri)
+        tokens = await request_token_once(code, lucidchart_service.exchange_code_for_token, code, redirect_uri)
         access_token = tokens.get("access_token")
         refresh_token = tokens.get("refresh_token", "")
         
         if not access_token:
             raise LucidchartAuthError("No access token received from Lucidchart")
         
-        # Escape tokens for JavaScript to prevent XSS
-        access_token_escaped = access_token.replace("'", "\\'").replace('"', '\\"')
-        refresh_token_escaped = refresh_token.replace("'", "\\'").replace('"', '\\"') if refresh_token else ""
-        
         logger.info("Lucidchart authentication successful")
         
-        return HTMLResponse(content=f"""<html>
-        <head>
-            <title>Authentication Successful</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    padding: 20px;
-                    text-align: center;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    min-height: 100vh;
-                    display: flex;
-                    flex-direction: column;
-                    justify-content: center;
-                    align-items: center;
-                }}
-                .success-box {{
-                    background: white;
-                    color: #333;
-                    padding: 30px;
-                    border-radius: 10px;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                    max-width: 400px;
-                }}
-                h1 {{
-                    color: #28a745;
-                    margin-bottom: 20px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="success-box">
-                <h1>✓ Authentication Successful!</h1>
-                <p>You can now close this window and return to the application.</p>
-                <p style="font-size: 14px; color: #666; margin-top: 20px;">This window will close automatically...</p>
-            </div>
-            <script>
-                try {{
-                    // Store token in sessionStorage
-                    sessionStorage.setItem('lucidchart_token', '{access_token_escaped}');
-                    {f"sessionStorage.setItem('lucidchart_refresh_token', '{refresh_token_escaped}');" if refresh_token_escaped else ""}
-                    
-                    // Notify parent window
-                    if (window.opener) {{
-                        window.opener.postMessage({{type: 'lucidchart_auth_success', token: '{access_token_escaped}'}}, '*');
-                    }}
-                    
-                    // Reload parent window to update UI
-                    if (window.opener && !window.opener.closed) {{
-                        window.opener.location.reload();
-                    }}
-                }} catch (e) {{
-                    console.error('Error storing token:', e);
-                }}
-                
-                setTimeout(() => {{
-                    window.close();
-                }}, 2000);
-            </script>
-        </body>
-        </html>""")
+        # tojson in the template renders the tokens as safe JavaScript string literals
+        response = HTMLResponse(content=page_templates["lucidchart_auth_success.html"].render(
+            access_token=access_token,
+            refresh_token=refresh_token
+        ))
+        remember_oauth_tokens("lucidchart", tokens, request, response)
+        return response
     except LucidchartAuthError as e:
         logger.error(f"Token exchange error: {e}")
-        error_msg = str(e).replace("'", "\\'").replace('"', '\\"')
-        return HTMLResponse(
-            content=f"""<html>
-            <head><title>Authentication Error</title></head>
-            <body style="font-family: Arial, sans-serif; padding: 20px; text-align: center;">
-                <h1 style="color: #d32f2f;">Authentication Failed</h1>
-                <p>{error_msg}</p>
-                <p>Please try again.</p>
-                <script>
-                    try {{
-                        if (window.opener) {{
-                            window.opener.postMessage({{type: 'lucidchart_auth_error', error: '{error_msg}'}}, '*');
-                        }}
-                    }} catch (e) {{
-                        console.error('Error notifying parent:', e);
-                    }}
-                    setTimeout(() => window.close(), 3000);
-                </script>
-            </body>
-            </html>"""
-        )
+        return HTMLResponse(content=lucidchart_error_page.render(
+            title="Authentication Error",
+            heading="Authentication Failed",
+            message=str(e),
+            hint="Please try again.",
+            notify_error=str(e)
+        ))
     except Exception as e:
         logger.error(f"Unexpected error in Lucidchart callback: {e}", exc_info=True)
-        error_msg = "An unexpected error occurred. Please try again."
-        return HTMLResponse(
-            content=f"""<html>
-            <head><title>Error</title></head>
-            <body style="font-family: Arial, sans-serif; padding: 20px; text-align: center;">
-                <h1 style="color: #d32f2f;">Error</h1>
-                <p>{error_msg}</p>
-                <script>
-                    setTimeout(() => window.close(), 3000);
-                </script>
-            </body>
-            </html>"""
-        )
+        return HTMLResponse(content=lucidchart_error_page.render(
+            title="Error",
+            heading="Error",
+            message="An unexpected error occurred. Please try again."
+        ))
 
 
 @app.get("/lucidchart-documents")
-async def get_lucidchart_documents(request: Request) -> JSONResponse:
+async def get_lucidchart_documents(request: Request) -> ORJSONResponse:
     """
     Get list of user's Lucidchart documents.
     
@@ -1307,21 +1477,32 @@ async def get_lucidchart_documents(request: Request) -> JSONResponse:
             detail="No access token provided. Please authenticate first."
         )
     
+    # Serve a recent listing for the same token without calling Lucidchart again
+    cache_key = token_digest(access_token)
+    documents = documents_cache.get(cache_key)
+    if documents is not None:
+        return ORJSONResponse({"documents": documents})
+    
+    api_token = await current_access_token(
+        "lucidchart", access_token, request, lucidchart_service.refresh_access_token
+    )
+    
     try:
-        documents = lucidchart_service.get_documents(access_token)
+        documents = await run_in_threadpool(lucidchart_service.get_documents, api_token)
         # Add embed URLs to each document
         for doc in documents:
             doc_id = doc.get('id')
             if doc_id:
-                doc['embed_url'] = lucidchart_service.get_document_embed_url(doc_id, access_token)
-        return JSONResponse({"documents": documents})
+                doc['embed_url'] = lucidchart_service.get_document_embed_url(doc_id, api_token)
+        documents_cache[cache_key] = documents
+        return ORJSONResponse({"documents": documents})
     except LucidchartAPIError as e:
         logger.error(f"Error getting documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/lucidchart-import/{process_id}")
-async def import_to_lucidchart(process_id: str, request: Request) -> JSONResponse:
+@app.post("/lucidchart-import/{process_id:process_id}")
+async def import_to_lucidchart(process_id: str, request: Request) -> ORJSONResponse:
     """
     Import CSV file to Lucidchart.
     
@@ -1335,11 +1516,11 @@ async def import_to_lucidchart(process_id: str, request: Request) -> JSONRespons
     Raises:
         HTTPException: If process not found, file not found, or import fails
     """
-    if process_id not in processes:
+    process_data = processes.get(process_id)
+    if process_data is None:
         raise HTTPException(status_code=404, detail="Process not found")
     
-    process_data = processes[process_id]
-    file_path = process_data.get('lucid_file')
+    file_path = process_data.lucid_file
     
     if not file_path or not file_service.file_exists(file_path):
         raise HTTPException(status_code=404, detail="File not found")
@@ -1359,19 +1540,24 @@ async def import_to_lucidchart(process_id: str, request: Request) -> JSONRespons
             detail="No access token provided. Please authenticate first."
         )
     
+    api_token = await current_access_token(
+        "lucidchart", access_token, request, lucidchart_service.refresh_access_token
+    )
+    
     try:
-        # Read CSV file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            csv_content = f.read()
-        
         # Create document in Lucidchart
-        result = lucidchart_service.create_document_from_csv(
-            csv_content,
-            document_name,
-            access_token
-        )
+        async with upload_slots:
+            result = await run_in_threadpool(
+                lucidchart_service.create_document_from_csv,
+                file_path,
+                document_name,
+                api_token
+            )
+        
+        # The new document should show up in the next listing
+        documents_cache.pop(token_digest(access_token), None)
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "document_id": result['document_id'],
             "embed_url": result['embed_url'],
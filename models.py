@@ -1,20 +1,21 @@
 """Data models and type definitions."""
-from typing import Dict, List, Optional, TypedDict
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Deque, List, Optional, TypedDict
 
 
-class ProcessData(TypedDict, total=False):
+@dataclass(slots=True)
+class ProcessData:
     """Process data structure."""
     status: str
-    logs: List[str]
+    logs: Deque[str]
     created_at: str
-    metadata_file: Optional[str]
-    lucid_file: Optional[str]
-    error: Optional[str]
-    has_metadata_file: bool
-    metadata_filename: Optional[str]
-    has_lucid_file: bool
-    lucid_filename: Optional[str]
+    app_name: Optional[str] = None
+    namespace_prefix: Optional[str] = None
+    error: Optional[str] = None
+    metadata_file: Optional[str] = None
+    metadata_filename: Optional[str] = None
+    lucid_file: Optional[str] = None
+    lucid_filename: Optional[str] = None
 
 
 class SalesforceCredentials(TypedDict):
@@ -36,6 +37,14 @@ class TokenResponse(TypedDict):
     signature: str
 
 
+class StoredOAuthTokens(TypedDict):
+    """Server-side OAuth tokens for a browser-held access token."""
+    browser_token_digest: str
+    access_token: str
+    refresh_token: str
+    expires_at: float
+
+
 class SalesforceObject(TypedDict):
     """Salesforce object metadata."""
     name: str
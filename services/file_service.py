@@ -2,11 +2,11 @@
 import csv
 import logging
 import os
-from datetime import datetime
+import re
+import tempfile
+from datetime import date
 from pathlib import Path
-from typing import List, Optional, Tuple
-
-import pandas as pd
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from config import get_settings
 from models import MetadataRow, LucidRow
@@ -14,6 +14,54 @@ from models import MetadataRow, LucidRow
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Characters dropped from app names used in file names (keeps letters, digits,
+# underscores, spaces and hyphens)
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\w -]+')
+
+# Metadata CSV columns, in the order the rows are built
+METADATA_FIELDNAMES = list(MetadataRow.__annotations__)
+# Download name of the metadata CSV; the file on disk is named per process
+METADATA_FILENAME = 'salesforce_metadata.csv'
+
+# Salesforce field type -> (database_type, constraint_type, referenced_table_name, column_length)
+TYPE_MAPPING: Dict[str, Tuple[str, str, str, str]] = {
+    'id': ("INT", "Primary Key", "", "11"),
+    'reference': ("INT", "Foreign Key", "reference", "11"),
+    'int': ("INT", "", "", "11"),
+    'boolean': ("INT", "", "", "1"),
+    'datetime': ("DATETIME", "", "", ""),
+    'date': ("DATE", "", "", ""),
+    'percent': ("FLOAT", "", "", "18"),
+    'string': ("TEXT", "", "", ""),
+    'textarea': ("TEXT", "", "", ""),
+    'json': ("TEXT", "", "", ""),
+}
+DEFAULT_TYPE_MAPPING: Tuple[str, str, str, str] = ("VARCHAR", "", "", "255")
+
+# Lucidchart CSV header
+LUCID_HEADER: List[str] = [
+    "dbms", "TABLE_SCHEMA", "TABLE_NAME", "COLUMN_NAME",
+    "ORDINAL_POSITION", "DATA_TYPE", "CHARACTER_MAXIMUM_LENGTH",
+    "CONSTRAINT_TYPE", "REFERENCED_TABLE_SCHEMA", "REFERENCED_TABLE_NAME",
+    "REFERENCED_COLUMN_NAME", "COMMENT"
+]
+
+
+def _lucid_type_columns(
+    mapping: Tuple[str, str, str, str]
+) -> Tuple[str, str, str, str]:
+    """Reorder a type mapping into the Lucid data type, length, constraint and referenced column."""
+    database_type, constraint_type, referenced_table_name, column_length = mapping
+    referenced_column = "Id" if referenced_table_name == 'reference' else ''
+    return database_type, column_length, constraint_type, referenced_column
+
+
+# Type-derived Lucid columns, resolved once per type instead of once per row
+LUCID_TYPE_COLUMNS: Dict[str, Tuple[str, str, str, str]] = {
+    data_type: _lucid_type_columns(mapping) for data_type, mapping in TYPE_MAPPING.items()
+}
+DEFAULT_LUCID_TYPE_COLUMNS = _lucid_type_columns(DEFAULT_TYPE_MAPPING)
+
 
 class FileService:
     """Service for file operations and CSV processing."""
@@ -29,26 +77,71 @@ class FileService:
         os.makedirs(self.input_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def save_metadata_csv(self, metadata_rows: List[MetadataRow]) -> str:
+    def save_metadata_csv(
+        self,
+        metadata_rows: Iterable[MetadataRow],
+        process_id: str,
+        should_continue: Optional[Callable[[], bool]] = None
+    ) -> Optional[str]:
         """
-        Save metadata to CSV file.
+        Save metadata to the process's CSV file.
+        
+        Rows are written as they are read, so a generator is streamed to disk.
+        They go to a temporary file that is moved into place only once every
+        row is written, so concurrent extractions never share a half-written
+        file.
         
         Args:
-            metadata_rows: List of metadata rows to save
+            metadata_rows: Metadata rows to save
+            process_id: Process identifier, used to name the file
+            should_continue: Optional callback checked before each row; once it
+                returns False the partial file is discarded
             
         Returns:
-            Path to the saved CSV file
+            Path to the saved CSV file, or None if the process was terminated
         """
-        df = pd.DataFrame(metadata_rows)
-        file_path = os.path.join(self.input_dir, 'salesforce_metadata.csv')
-        df.to_csv(file_path, index=False)
+        file_path = os.path.join(self.input_dir, f"{process_id}_{METADATA_FILENAME}")
+        fd, temp_path = tempfile.mkstemp(dir=self.input_dir, suffix='.csv.tmp')
+        try:
+            with open(fd, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=METADATA_FIELDNAMES)
+                writer.writeheader()
+                for row in metadata_rows:
+                    if should_continue and not should_continue():
+                        break
+                    writer.writerow(row)
+            # The row generator stops early once the process is terminated
+            if should_continue and not should_continue():
+                os.remove(temp_path)
+                logger.info(f"Discarded partial metadata for terminated process {process_id}")
+                return None
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
         logger.info(f"Metadata saved to {file_path}")
         return file_path
     
+    @staticmethod
+    def remove_file(file_path: Optional[str]) -> None:
+        """
+        Delete a generated file, ignoring files that are already gone.
+        
+        Args:
+            file_path: Path to the file, or None
+        """
+        if not file_path:
+            return
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+    
     @staticmethod
     def _format_date() -> str:
         """Format current date for filename."""
-        return datetime.now().replace(microsecond=0).strftime('%Y_%m_%d')
+        return date.today().strftime('%Y_%m_%d')
     
     @staticmethod
     def map_data_type(data_type: str) -> Tuple[str, str, str, str]:
@@ -61,20 +154,7 @@ class FileService:
         Returns:
             Tuple of (database_type, constraint_type, referenced_table_name, column_length)
         """
-        type_mapping = {
-            'id': ("INT", "Primary Key", "", "11"),
-            'reference': ("INT", "Foreign Key", "reference", "11"),
-            'int': ("INT", "", "", "11"),
-            'boolean': ("INT", "", "", "1"),
-            'datetime': ("DATETIME", "", "", ""),
-            'date': ("DATE", "", "", ""),
-            'percent': ("FLOAT", "", "", "18"),
-            'string': ("TEXT", "", "", ""),
-            'textarea': ("TEXT", "", "", ""),
-            'json': ("TEXT", "", "", ""),
-        }
-        
-        return type_mapping.get(data_type, ("VARCHAR", "", "", "255"))
+        return TYPE_MAPPING.get(data_type, DEFAULT_TYPE_MAPPING)
     
     def generate_lucid_csv(self, metadata_file_path: str, app_name: Optional[str] = None) -> str:
         """
@@ -89,75 +169,62 @@ class FileService:
         """
         logger.info(f"Generating Lucidchart CSV from {metadata_file_path}")
         
-        # Read metadata CSV
-        with open(metadata_file_path, 'r', newline='', encoding='utf-8') as file:
-            csv_reader = csv.reader(file)
-            csv_data = list(csv_reader)
-        
-        # Prepare output data with headers
-        output_data: List[List[str]] = [[
-            "dbms", "TABLE_SCHEMA", "TABLE_NAME", "COLUMN_NAME", 
-            "ORDINAL_POSITION", "DATA_TYPE", "CHARACTER_MAXIMUM_LENGTH", 
-            "CONSTRAINT_TYPE", "REFERENCED_TABLE_SCHEMA", "REFERENCED_TABLE_NAME", 
-            "REFERENCED_COLUMN_NAME", "COMMENT"
-        ]]
-        
-        position_index = 0
-        last_table = ''
-        
-        # Process each row (skip header)
-        for row in csv_data[1:]:
-            if len(row) < 8:
-                continue
-                
-            table_object, table_field, table_type, _, _, _, table_reference_to, _ = row
-            
-            # Reset position index for new table
-            if last_table != table_object:
-                last_table = table_object
-                position_index = 0
-            position_index += 1
-            
-            # Map data type
-            mapped_data_type, constraint_type, referenced_table_name, column_length = \
-                self.map_data_type(table_type)
-            
-            # Determine referenced column
-            referenced_column = "Id" if referenced_table_name == 'reference' else ''
-            
-            # Parse reference table
-            reference_tables = table_reference_to.split(',')
-            table_reference = reference_tables[-1] if len(reference_tables) > 1 else reference_tables[0]
-            
-            # Append row
-            output_data.append([
-                "mysql",
-                "dbo",
-                table_object,
-                table_field,
-                str(position_index),
-                mapped_data_type,
-                column_length,
-                constraint_type,
-                "dbo",
-                table_reference,
-                referenced_column,
-                ""
-            ])
-        
-        # Write output file with app name in filename
+        # Output file with app name in filename
         date_str = self._format_date()
         if app_name:
             # Sanitize app name for filename
-            safe_app_name = "".join(c for c in app_name if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
+            safe_app_name = UNSAFE_FILENAME_CHARS.sub('', app_name).strip().replace(' ', '_')
             output_filename = f"{date_str}_{safe_app_name}_salesforce_metadata_lucid.csv"
         else:
             output_filename = f"{date_str}_salesforce_metadata_lucid.csv"
         output_file_path = os.path.join(self.output_dir, output_filename)
         
-        with open(output_file_path, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerows(output_data)
+        position_index = 0
+        last_table = ''
+        lucid_type_columns = LUCID_TYPE_COLUMNS.get
+        
+        # Stream rows from the metadata CSV straight into the Lucid CSV, so only
+        # one row is held in memory at a time
+        with open(metadata_file_path, 'r', newline='', encoding='utf-8') as source, \
+                open(output_file_path, 'w', newline='', encoding='utf-8') as target:
+            csv_reader = csv.reader(source)
+            next(csv_reader, None)  # Skip header
+            writer = csv.writer(target)
+            writer.writerow(LUCID_HEADER)
+            
+            for row in csv_reader:
+                if len(row) < 8:
+                    continue
+                
+                table_object, table_field, table_type, _, _, _, table_reference_to, _ = row
+                
+                # Reset position index for new table
+                if last_table != table_object:
+                    last_table = table_object
+                    position_index = 0
+                position_index += 1
+                
+                # Map data type and referenced column
+                mapped_data_type, column_length, constraint_type, referenced_column = \
+                    lucid_type_columns(table_type, DEFAULT_LUCID_TYPE_COLUMNS)
+                
+                # Parse reference table (the last one when there are several)
+                table_reference = table_reference_to.rpartition(',')[2]
+                
+                writer.writerow([
+                    "mysql",
+                    "dbo",
+                    table_object,
+                    table_field,
+                    str(position_index),
+                    mapped_data_type,
+                    column_length,
+                    constraint_type,
+                    "dbo",
+                    table_reference,
+                    referenced_column,
+                    ""
+                ])
         
         logger.info(f"Lucidchart CSV generated at {output_file_path}")
         return output_file_path
@@ -172,5 +239,6 @@ class FileService:
         Returns:
             True if file exists, False otherwise
         """
-        return os.path.exists(file_path) and os.path.isfile(file_path)
+        # isfile is False for missing paths, so one stat covers both checks
+        return os.path.isfile(file_path)
 
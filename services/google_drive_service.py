@@ -2,16 +2,99 @@
 import logging
 import os
 from typing import Optional, Dict
+from urllib.parse import quote, urlencode
 
+import orjson
 import requests
 
-from config import get_settings, GOOGLE_OAUTH_URL, GOOGLE_TOKEN_URL, GOOGLE_DRIVE_UPLOAD_URL, GOOGLE_DRIVE_API_URL
+from config import get_settings, GOOGLE_OAUTH_URL, GOOGLE_TOKEN_URL, GOOGLE_DRIVE_UPLOAD_URL
 from exceptions import GoogleDriveAuthError, GoogleDriveUploadError
+from utils import create_retrying_session
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class MultipartUploadBody:
+    """
+    File-like multipart/related body that streams the file from disk.
+    
+    requests sends the body by reading it in blocks, so the CSV is read while
+    the upload is in progress instead of being loaded up front. The body has a
+    known length (sent as Content-Length) and can be rewound, which urllib3
+    needs to resend it on a retry.
+    """
+    
+    def __init__(self, preamble: bytes, file_path: str, epilogue: bytes):
+        """
+        Open the file to stream between the multipart preamble and epilogue.
+        
+        Args:
+            preamble: Encoded boundary, metadata part and media part headers
+            file_path: Path to the file to upload
+            epilogue: Encoded closing boundary
+        """
+        self._preamble = preamble
+        self._epilogue = epilogue
+        self._file = open(file_path, 'rb')
+        self._file_start = len(preamble)
+        self._file_end = self._file_start + os.fstat(self._file.fileno()).st_size
+        self._length = self._file_end + len(epilogue)
+        self._position = 0
+    
+    def __len__(self) -> int:
+        """Return the total body length in bytes."""
+        return self._length
+    
+    def tell(self) -> int:
+        """Return the current read position."""
+        return self._position
+    
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Move the read position (used to rewind before a retry), like file.seek."""
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._length
+        elif whence != os.SEEK_SET:
+            raise ValueError(f"Invalid whence: {whence}")
+        self._position = max(0, min(offset, self._length))
+        self._file.seek(min(max(0, self._position - self._file_start), self._file_end - self._file_start))
+        return self._position
+    
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read up to size bytes of the body.
+        
+        Args:
+            size: Maximum number of bytes to read, or -1 for the rest of the body
+            
+        Returns:
+            Next chunk of the body, empty at the end
+        """
+        if size is None or size < 0:
+            size = self._length - self._position
+        chunks = []
+        while size > 0 and self._position < self._length:
+            if self._position < self._file_start:
+                chunk = self._preamble[self._position:self._position + size]
+            elif self._position < self._file_end:
+                chunk = self._file.read(min(size, self._file_end - self._position))
+                if not chunk:
+                    raise IOError("File changed size during upload")
+            else:
+                offset = self._position - self._file_end
+                chunk = self._epilogue[offset:offset + size]
+            chunks.append(chunk)
+            self._position += len(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+    
+    def close(self) -> None:
+        """Close the underlying file."""
+        self._file.close()
+
+
 class GoogleDriveService:
     """Service for Google Drive operations."""
     
@@ -19,6 +102,10 @@ class GoogleDriveService:
         """Initialize the Google Drive service."""
         self.client_id = settings.google_client_id
         self.client_secret = settings.google_client_secret
+        
+        # Shared session so token exchanges and API calls reuse keep-alive
+        # connections; the pool holds one connection per concurrent upload
+        self.session = create_retrying_session(max(10, settings.max_concurrent_uploads), total=3)
     
     def get_auth_url(self, redirect_uri: str) -> str:
         """
@@ -48,7 +135,8 @@ class GoogleDriveService:
             'prompt': 'consent'
         }
         
-        query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
+        # Percent-encode values such as redirect_uri and scope
+        query_string = urlencode(params, quote_via=quote)
         return f"{GOOGLE_OAUTH_URL}?{query_string}"
     
     def exchange_code_for_token(self, code: str, redirect_uri: str) -> Dict[str, str]:
@@ -80,7 +168,7 @@ class GoogleDriveService:
         }
         
         try:
-            response = requests.post(GOOGLE_TOKEN_URL, data=token_data, timeout=30)
+            response = self.session.post(GOOGLE_TOKEN_URL, data=token_data, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.HTTPError as e:
@@ -90,6 +178,37 @@ class GoogleDriveService:
             logger.error(f"Request error during token exchange: {e}")
             raise GoogleDriveAuthError(f"Network error during token exchange: {e}")
     
+    def refresh_access_token(self, refresh_token: str) -> Dict[str, str]:
+        """
+        Mint a new access token from a refresh token.
+        
+        Args:
+            refresh_token: Refresh token from an earlier token exchange
+            
+        Returns:
+            Token response containing the new access_token and expires_in
+            
+        Raises:
+            GoogleDriveAuthError: If the refresh fails
+        """
+        token_data = {
+            'refresh_token': refresh_token,
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'grant_type': 'refresh_token'
+        }
+        
+        try:
+            response = self.session.post(GOOGLE_TOKEN_URL, data=token_data, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"Token refresh failed: {e}")
+            raise GoogleDriveAuthError(f"Failed to refresh access token: {e}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error during token refresh: {e}")
+            raise GoogleDriveAuthError(f"Network error during token refresh: {e}")
+    
     def upload_file(self, file_path: str, access_token: str) -> Dict[str, str]:
         """
         Upload a file to Google Drive.
@@ -104,35 +223,31 @@ class GoogleDriveService:
         Raises:
             GoogleDriveUploadError: If upload fails
         """
-        if not os.path.exists(file_path):
-            raise GoogleDriveUploadError(f"File not found: {file_path}")
-        
         file_metadata = {'name': os.path.basename(file_path)}
         
-        # Read file content
-        try:
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
-        except IOError as e:
-            raise GoogleDriveUploadError(f"Failed to read file: {e}")
-        
         # Create multipart request
         boundary = '----WebKitFormBoundary7MA4YWxkTrZu0gW'
         
-        # Build multipart body
-        body_parts = [
-            f'--{boundary}',
-            'Content-Type: application/json; charset=UTF-8',
-            '',
-            str(file_metadata).replace("'", '"'),
-            f'--{boundary}',
-            'Content-Type: text/csv',
-            '',
-            file_content.decode('utf-8'),
-            f'--{boundary}--'
-        ]
-        
-        body = '\r\n'.join(body_parts).encode('utf-8')
+        # Build multipart body around the raw file bytes, without decoding and
+        # re-encoding the CSV
+        preamble = (
+            f'--{boundary}\r\n'
+            'Content-Type: application/json; charset=UTF-8\r\n'
+            '\r\n'
+            f'{orjson.dumps(file_metadata).decode()}\r\n'
+            f'--{boundary}\r\n'
+            'Content-Type: text/csv\r\n'
+            '\r\n'
+        ).encode('utf-8')
+        epilogue = f'\r\n--{boundary}--'.encode('utf-8')
+        
+        # Stream the file from disk while uploading
+        try:
+            body = MultipartUploadBody(preamble, file_path, epilogue)
+        except FileNotFoundError:
+            raise GoogleDriveUploadError(f"File not found: {file_path}")
+        except IOError as e:
+            raise GoogleDriveUploadError(f"Failed to read file: {e}")
         
         headers = {
             'Authorization': f'Bearer {access_token}',
@@ -140,31 +255,20 @@ class GoogleDriveService:
         }
         
         try:
-            # Upload file
-            response = requests.post(
+            # Upload file, asking for the web view link in the same response
+            response = self.session.post(
                 GOOGLE_DRIVE_UPLOAD_URL,
+                params={'fields': 'id,webViewLink'},
                 headers=headers,
                 data=body,
                 timeout=60
             )
             response.raise_for_status()
-            file_data = response.json()
-            file_id = file_data.get('id')
-            
-            # Get web view link
-            file_info_url = f"{GOOGLE_DRIVE_API_URL}/{file_id}?fields=webViewLink"
-            file_info_response = requests.get(
-                file_info_url,
-                headers={'Authorization': f'Bearer {access_token}'},
-                timeout=30
-            )
-            web_view_link = ''
-            if file_info_response.ok:
-                web_view_link = file_info_response.json().get('webViewLink', '')
+            file_data = orjson.loads(response.content)
             
             return {
-                'file_id': file_id,
-                'web_view_link': web_view_link
+                'file_id': file_data.get('id'),
+                'web_view_link': file_data.get('webViewLink', '')
             }
         except requests.exceptions.HTTPError as e:
             logger.error(f"Upload failed: {e}")
@@ -172,4 +276,11 @@ class GoogleDriveService:
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error during upload: {e}")
             raise GoogleDriveUploadError(f"Network error during upload: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid upload response: {e}")
+            raise GoogleDriveUploadError(f"Invalid response from Google Drive: {e}")
+        except IOError as e:
+            raise GoogleDriveUploadError(f"Failed to read file: {e}")
+        finally:
+            body.close()
 
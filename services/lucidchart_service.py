@@ -1,20 +1,28 @@
 """Lucidchart API service."""
 import logging
 from typing import Dict, List, Optional
+from urllib.parse import quote, urlencode, urljoin, urlsplit
 
+import orjson
 import requests
 
 from config import (
     get_settings,
     LUCIDCHART_OAUTH_URL,
     LUCIDCHART_TOKEN_URL,
-    LUCIDCHART_DOCUMENTS_URL
+    LUCIDCHART_DOCUMENTS_URL,
+    LUCIDCHART_MAX_DOCUMENT_PAGES
 )
-from exceptions import LucidchartError, LucidchartAuthError, LucidchartAPIError
+from exceptions import LucidchartAuthError, LucidchartAPIError
+from utils import create_retrying_session
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Scheme and host that document pages may be fetched from; the bearer token
+# is never sent to a pagination link pointing anywhere else
+_DOCUMENTS_ORIGIN = urlsplit(LUCIDCHART_DOCUMENTS_URL)[:2]
+
 
 class LucidchartService:
     """Service for Lucidchart operations."""
@@ -23,6 +31,10 @@ class LucidchartService:
         """Initialize the Lucidchart service."""
         self.client_id = settings.lucidchart_client_id
         self.client_secret = settings.lucidchart_client_secret
+        
+        # Shared session so token exchanges and API calls reuse keep-alive
+        # connections; the pool holds one connection per concurrent upload
+        self.session = create_retrying_session(max(10, settings.max_concurrent_uploads), total=3)
     
     def get_auth_url(self, redirect_uri: str, state: Optional[str] = None) -> str:
         """
@@ -54,13 +66,8 @@ class LucidchartService:
             'state': state or ''
         }
         
-        # Build query string, filtering out empty values
-        query_parts = []
-        for k, v in params.items():
-            if v:
-                query_parts.append(f"{k}={v}")
-        
-        query_string = '&'.join(query_parts)
+        # Build percent-encoded query string, filtering out empty values
+        query_string = urlencode({k: v for k, v in params.items() if v}, quote_via=quote)
         auth_url = f"{LUCIDCHART_OAUTH_URL}?{query_string}"
         
         logger.info(f"Generated Lucidchart OAuth URL: {auth_url}")
@@ -100,7 +107,7 @@ class LucidchartService:
         }
         
         try:
-            response = requests.post(LUCIDCHART_TOKEN_URL, headers=headers, data=token_data, timeout=30)
+            response = self.session.post(LUCIDCHART_TOKEN_URL, headers=headers, data=token_data, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.HTTPError as e:
@@ -111,10 +118,50 @@ class LucidchartService:
             logger.error(f"Request error during token exchange: {e}")
             raise LucidchartAuthError(f"Network error during token exchange: {e}")
     
+    def refresh_access_token(self, refresh_token: str) -> Dict[str, str]:
+        """
+        Mint a new access token from a refresh token.
+        
+        Args:
+            refresh_token: Refresh token from an earlier token exchange
+            
+        Returns:
+            Token response containing the new access_token, expires_in and
+            possibly a rotated refresh_token
+            
+        Raises:
+            LucidchartAuthError: If the refresh fails
+        """
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+        
+        token_data = {
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token,
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        }
+        
+        try:
+            response = self.session.post(LUCIDCHART_TOKEN_URL, headers=headers, data=token_data, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"Token refresh failed: {e}")
+            raise LucidchartAuthError(f"Failed to refresh access token: {response.text}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error during token refresh: {e}")
+            raise LucidchartAuthError(f"Network error during token refresh: {e}")
+    
     def get_documents(self, access_token: str) -> List[Dict]:
         """
         Get list of user's Lucidchart documents.
         
+        Follows the API's Link-header pagination so accounts with many
+        documents are not truncated to the first page. Next-page links on
+        another scheme or host end pagination.
+        
         Args:
             access_token: Lucidchart OAuth2 access token
             
@@ -129,17 +176,33 @@ class LucidchartService:
             'Content-Type': 'application/json'
         }
         
+        documents: List[Dict] = []
+        url: Optional[str] = LUCIDCHART_DOCUMENTS_URL
+        
         try:
-            response = requests.get(LUCIDCHART_DOCUMENTS_URL, headers=headers, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('data', [])
+            for _ in range(LUCIDCHART_MAX_DOCUMENT_PAGES):
+                response = self.session.get(url, headers=headers, timeout=30)
+                response.raise_for_status()
+                documents.extend(orjson.loads(response.content).get('data', []))
+                
+                # requests parses the Link header into response.links
+                next_url = response.links.get('next', {}).get('url')
+                if not next_url:
+                    break
+                url = urljoin(url, next_url)
+                if urlsplit(url)[:2] != _DOCUMENTS_ORIGIN:
+                    logger.warning(f"Ignoring Lucidchart documents page outside the API host: {url}")
+                    break
+            return documents
         except requests.exceptions.HTTPError as e:
             logger.error(f"Failed to get documents: {e}")
             raise LucidchartAPIError(f"Failed to retrieve documents: {e}")
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error while getting documents: {e}")
             raise LucidchartAPIError(f"Network error while retrieving documents: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid documents response: {e}")
+            raise LucidchartAPIError(f"Invalid response while retrieving documents: {e}")
     
     def get_document_embed_url(self, document_id: str, access_token: str) -> str:
         """
@@ -157,7 +220,7 @@ class LucidchartService:
     
     def create_document_from_csv(
         self,
-        csv_content: str,
+        csv_path: str,
         document_name: str,
         access_token: str
     ) -> Dict[str, str]:
@@ -167,8 +230,11 @@ class LucidchartService:
         Note: This is a placeholder. Lucidchart API may require specific format
         or may need to be done through their import feature.
         
+        The CSV is not sent with the request (see below), so it is referenced by
+        path rather than read into memory.
+        
         Args:
-            csv_content: CSV file content
+            csv_path: Path to the generated Lucid CSV file
             document_name: Name for the new document
             access_token: Lucidchart OAuth2 access token
             
@@ -194,7 +260,7 @@ class LucidchartService:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 LUCIDCHART_DOCUMENTS_URL,
                 headers=headers,
                 json=document_data,
@@ -0,0 +1,137 @@
+"""In-memory registry of extraction processes."""
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, Optional
+
+from config import STATUS_COMPLETED, STATUS_ERROR, STATUS_TERMINATED
+from models import ProcessData
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a process's background task no longer touches its data
+FINISHED_STATUSES = frozenset({STATUS_COMPLETED, STATUS_ERROR, STATUS_TERMINATED})
+
+
+class ProcessRegistry:
+    """
+    Registry of process data with lock-free reads.
+
+    Readers (status polls, route lookups, log appends) go through an immutable
+    snapshot of the registry without taking a lock. Writers serialize on a
+    single lock, copy the current mapping, apply their change and publish the
+    new snapshot with one reference assignment, so a reader always sees either
+    the old or the new mapping, never a half-updated one.
+
+    Only registry membership is copy-on-write; each process's data is still
+    updated in place by the background task that owns it.
+
+    When a max age is set, finished processes older than it are dropped the
+    next time a process is registered, so memory stays bounded by recent
+    activity instead of growing for the life of the worker. An optional
+    callback releases whatever else an evicted process holds (e.g. its files).
+    """
+
+    def __init__(
+        self,
+        max_age: Optional[float] = None,
+        on_evict: Optional[Callable[[ProcessData], None]] = None
+    ):
+        """
+        Initialize an empty registry.
+
+        Args:
+            max_age: Seconds a finished process is kept after registration,
+                or None to keep processes until they are deleted
+            on_evict: Optional callback run, outside the lock, with the data of
+                each evicted process
+        """
+        self._lock = threading.Lock()
+        self._snapshot: Mapping[str, ProcessData] = MappingProxyType({})
+        self._max_age = max_age
+        self._on_evict = on_evict
+        self._registered_at: Dict[str, float] = {}
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether a key is registered."""
+        return key in self._snapshot
+
+    def __getitem__(self, key: str) -> ProcessData:
+        """Return the data registered under a key."""
+        return self._snapshot[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys of the current snapshot."""
+        return iter(self._snapshot)
+
+    def __len__(self) -> int:
+        """Return the number of registered keys."""
+        return len(self._snapshot)
+
+    def get(self, key: str, default: Optional[ProcessData] = None) -> Optional[ProcessData]:
+        """
+        Return the data registered under a key.
+
+        Args:
+            key: Registry key
+            default: Value returned when the key is not registered
+
+        Returns:
+            Registered data or the default
+        """
+        return self._snapshot.get(key, default)
+
+    def __setitem__(self, key: str, value: ProcessData) -> None:
+        """Register data under a key, publishing a new snapshot."""
+        now = time.monotonic()
+        evicted: List[ProcessData] = []
+        with self._lock:
+            updated: Dict[str, ProcessData] = dict(self._snapshot)
+            if self._max_age is not None:
+                evicted = self._evict_expired(updated, now - self._max_age)
+            updated[key] = value
+            self._registered_at[key] = now
+            self._snapshot = MappingProxyType(updated)
+        if self._on_evict is not None:
+            for data in evicted:
+                self._on_evict(data)
+
+    def __delitem__(self, key: str) -> None:
+        """Remove a key, publishing a new snapshot."""
+        with self._lock:
+            updated: Dict[str, ProcessData] = dict(self._snapshot)
+            del updated[key]
+            self._registered_at.pop(key, None)
+            self._snapshot = MappingProxyType(updated)
+
+    def _evict_expired(self, updated: Dict[str, ProcessData], cutoff: float) -> List[ProcessData]:
+        """
+        Drop finished processes registered before a cutoff. Caller holds the lock.
+
+        Args:
+            updated: Working copy of the registry to evict from
+            cutoff: Monotonic time before which finished processes expire
+
+        Returns:
+            Data of the evicted processes
+        """
+        expired = [
+            key for key, registered_at in self._registered_at.items()
+            if registered_at < cutoff and updated[key].status in FINISHED_STATUSES
+        ]
+        evicted = [updated.pop(key) for key in expired]
+        for key in expired:
+            del self._registered_at[key]
+        if expired:
+            logger.info(f"Evicted {len(expired)} finished processes from the registry")
+        return evicted
+
+    def snapshot(self) -> Mapping[str, ProcessData]:
+        """
+        Return the current read-only view of the registry.
+
+        Returns:
+            Immutable mapping of keys to process data
+        """
+        return self._snapshot
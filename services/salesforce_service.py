@@ -1,18 +1,29 @@
 """Salesforce API service."""
+import hashlib
 import logging
+import re
+import sys
+import threading
+import orjson
 import requests
-from typing import Dict, List, Optional
-from urllib.parse import quote
+from cachetools import TTLCache
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlencode
 
 from config import (
     get_settings, 
     SALESFORCE_AUTH_URL, 
-    SALESFORCE_TOKEN_URL, 
+    SALESFORCE_TOKEN_ENDPOINTS, 
     SALESFORCE_OBJECTS_URL, 
     SALESFORCE_DESCRIBE_URL,
     SALESFORCE_QUERY_URL,
     SALESFORCE_TOOLING_QUERY_URL,
     SALESFORCE_UI_API_APPS_URL,
+    SALESFORCE_COMPOSITE_URL,
+    SALESFORCE_COMPOSITE_MAX_SUBREQUESTS,
+    SALESFORCE_SOQL_ID_BATCH_SIZE,
     SALESFORCE_PRODUCTION_URL,
     SALESFORCE_SANDBOX_URL
 )
@@ -25,10 +36,105 @@ from models import (
     MetadataRow,
     SalesforceApp
 )
+from utils import create_retrying_session, token_digest
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Instance URL markers of Developer Edition orgs and sandbox orgs
+DEV_ORG_PATTERN = re.compile(r'dev-ed|develop\.my\.salesforce\.com|\.develop\.', re.IGNORECASE)
+SANDBOX_ORG_PATTERN = re.compile(r'test\.salesforce\.com|sandbox|\.cs', re.IGNORECASE)
+
+# Field attributes kept from describe responses; a describe field carries
+# dozens more (labels, help text, picklist values) that the export never reads
+FIELD_ATTRIBUTES = tuple(SalesforceField.__annotations__)
+
+# Describe statuses that fail the same way on every run (the user may not
+# describe the object, or it does not exist), so they are cached as no fields
+DESCRIBE_PERMANENT_ERROR_STATUSES = frozenset({403, 404})
+
+
+def _slim_fields(fields: List[Dict]) -> List[SalesforceField]:
+    """
+    Reduce describe fields to the attributes declared on SalesforceField.
+    
+    Keeps batches in flight and cached describes small, since the full
+    describe field dicts are dropped as soon as a response is parsed. Field
+    types and referenced object names repeat across thousands of fields, so
+    they are interned to share one string per distinct value.
+    
+    Args:
+        fields: Field dictionaries from a describe response
+        
+    Returns:
+        Field metadata with only the SalesforceField attributes
+    """
+    slim_fields: List[SalesforceField] = []
+    for field in fields:
+        slim_field = {key: field[key] for key in FIELD_ATTRIBUTES if key in field}
+        field_type = slim_field.get('type')
+        if isinstance(field_type, str):
+            slim_field['type'] = sys.intern(field_type)
+        reference_to = slim_field.get('referenceTo')
+        if reference_to:
+            slim_field['referenceTo'] = [sys.intern(name) for name in reference_to]
+        slim_fields.append(slim_field)
+    return slim_fields
+
+
+def _metadata_row(object_name: str, field: SalesforceField) -> MetadataRow:
+    """
+    Build the metadata row for one described field, looking each attribute up once.
+    
+    Args:
+        object_name: Name of the object the field belongs to
+        field: Field metadata from the describe response (must have a name)
+        
+    Returns:
+        Metadata row with 'N/A' for empty attributes
+    """
+    length = field.get('length')
+    precision = field.get('precision')
+    scale = field.get('scale')
+    reference_to = field.get('referenceTo')
+    if not reference_to:
+        reference_to = 'N/A'
+    elif len(reference_to) == 1:
+        # Most lookups reference one object; reuse its (interned) name as is
+        reference_to = reference_to[0]
+    else:
+        reference_to = ','.join(reference_to)
+    relationship_name = field.get('relationshipName')
+    return {
+        'Object': object_name,
+        'Field': field['name'],
+        'Type': field.get('type', 'N/A'),
+        'Length': str(length) if length else 'N/A',
+        'Precision': str(precision) if precision else 'N/A',
+        'Scale': str(scale) if scale else 'N/A',
+        'ReferenceTo': reference_to,
+        'RelationshipName': relationship_name if relationship_name else 'N/A'
+    }
+
+
+class SalesforceURLs:
+    """Salesforce REST API paths with the API version already bound."""
+    
+    def __init__(self, api_version: str):
+        """
+        Pre-format the versioned endpoint paths.
+        
+        Args:
+            api_version: Salesforce API version (e.g. v53.0)
+        """
+        self.objects = SALESFORCE_OBJECTS_URL.format(version=api_version)
+        # Leave {object_name} in place for per-object substitution
+        self.describe = SALESFORCE_DESCRIBE_URL.format(version=api_version, object_name="{object_name}")
+        self.query = SALESFORCE_QUERY_URL.format(version=api_version)
+        self.tooling_query = SALESFORCE_TOOLING_QUERY_URL.format(version=api_version)
+        self.ui_api_apps = SALESFORCE_UI_API_APPS_URL.format(version=api_version)
+        self.composite = SALESFORCE_COMPOSITE_URL.format(version=api_version)
+
 
 class SalesforceService:
     """Service for interacting with Salesforce API."""
@@ -36,6 +142,41 @@ class SalesforceService:
     def __init__(self):
         """Initialize the Salesforce service."""
         self.api_version = settings.salesforce_api_version
+        self.urls = SalesforceURLs(self.api_version)
+        self.describe_concurrency = settings.salesforce_describe_concurrency
+        
+        # Shared session so token, query and describe calls reuse pooled
+        # keep-alive connections instead of a new TCP/TLS handshake per request,
+        # and one hiccup does not abort a long extraction. Only GETs are
+        # retried after the request is sent: resending a token POST could
+        # redeem an authorization code twice or repeat a login
+        self.session = create_retrying_session(10, total=5)
+        # Composite describes are POSTs only because the composite API takes a
+        # request body; every subrequest is a read-only describe GET, so the
+        # whole batch is safe to resend. They get their own session, sized for
+        # the describe workers of every extraction that may run at once, since
+        # the service (and so the pool) is shared by all of them
+        self.composite_session = create_retrying_session(
+            max(10, self.describe_concurrency * settings.max_concurrent_extractions),
+            total=5,
+            allowed_methods=frozenset({'GET', 'POST'})
+        )
+        
+        # Password-flow tokens per credentials digest, so loading apps and the
+        # extraction that follows do not each log in; the per-digest locks make
+        # concurrent logins with the same credentials share one token request
+        self._token_cache: TTLCache = TTLCache(
+            maxsize=256, ttl=settings.salesforce_token_cache_seconds
+        )
+        self._token_locks: Dict[str, threading.Lock] = {}
+        self._token_lock = threading.Lock()
+        
+        # Describe results per (instance URL, access token digest, object name);
+        # keyed by token because field visibility depends on the user
+        self._describe_cache: TTLCache = TTLCache(
+            maxsize=4096, ttl=settings.salesforce_describe_cache_seconds
+        )
+        self._describe_cache_lock = threading.Lock()
     
     def get_auth_url(
         self,
@@ -60,20 +201,18 @@ class SalesforceService:
         instance_url = instance_url.rstrip('/')
         auth_url = f"{instance_url}{SALESFORCE_AUTH_URL}"
         
-        # URL-encode the redirect_uri to handle special characters
-        encoded_redirect_uri = quote(redirect_uri, safe='')
-        
-        query_parts = [
-            f"response_type=code",
-            f"client_id={client_id}",
-            f"redirect_uri={encoded_redirect_uri}",
-            f"scope=api refresh_token offline_access"
-        ]
+        params = {
+            'response_type': 'code',
+            'client_id': client_id,
+            'redirect_uri': redirect_uri,
+            'scope': 'api refresh_token offline_access'
+        }
         
         if state:
-            query_parts.append(f"state={state}")
+            params['state'] = state
         
-        query_string = '&'.join(query_parts)
+        # Percent-encode every value, including redirect_uri and scope
+        query_string = urlencode(params, quote_via=quote)
         full_auth_url = f"{auth_url}?{query_string}"
         
         logger.info(f"Generated Salesforce OAuth URL for instance: {instance_url}")
@@ -108,14 +247,14 @@ class SalesforceService:
         
         # Determine if this is a sandbox or production org
         # Token endpoint is always login.salesforce.com or test.salesforce.com, not the instance URL
-        if 'test.salesforce.com' in instance_url.lower() or 'sandbox' in instance_url.lower() or '.cs' in instance_url.lower():
+        if SANDBOX_ORG_PATTERN.search(instance_url):
             # Sandbox org
             login_url = SALESFORCE_SANDBOX_URL
         else:
             # Production org (or custom domain - use production login)
             login_url = SALESFORCE_PRODUCTION_URL
         
-        token_url = f"{login_url}{SALESFORCE_TOKEN_URL}"
+        token_url = SALESFORCE_TOKEN_ENDPOINTS[login_url]
         
         logger.info("Exchanging authorization code for access token...")
         logger.info(f"Using login URL: {login_url}")
@@ -131,7 +270,7 @@ class SalesforceService:
         try:
             # Use application/x-www-form-urlencoded content type as per Salesforce requirements
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            response = requests.post(token_url, headers=headers, data=payload, timeout=30)
+            response = self.session.post(token_url, headers=headers, data=payload, timeout=30)
             
             if not response.ok:
                 error_detail = "Unknown error"
@@ -160,7 +299,52 @@ class SalesforceService:
     
     def get_access_token(self, credentials: SalesforceCredentials) -> TokenResponse:
         """
-        Retrieve access token from Salesforce using password flow.
+        Retrieve access token from Salesforce using password flow, reusing a recent one.
+        
+        Tokens are cached for SALESFORCE_TOKEN_CACHE_SECONDS under a digest of
+        the full credentials, and concurrent calls with the same credentials
+        wait for a single token request.
+        
+        Args:
+            credentials: Salesforce authentication credentials
+            
+        Returns:
+            Token response containing access token and instance information
+            
+        Raises:
+            AuthenticationError: If authentication fails
+        """
+        key = hashlib.sha256(
+            "\0".join(
+                credentials.get(name, '')
+                for name in ('client_id', 'client_secret', 'username', 'password', 'instance_url')
+            ).encode()
+        ).hexdigest()
+        
+        with self._token_lock:
+            token_data = self._token_cache.get(key)
+            if token_data is not None:
+                logger.info("Reusing cached access token.")
+                return token_data
+            key_lock = self._token_locks.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            # Another thread may have fetched the token while this one waited
+            with self._token_lock:
+                token_data = self._token_cache.get(key)
+            if token_data is None:
+                try:
+                    token_data = self._request_access_token(credentials)
+                    with self._token_lock:
+                        self._token_cache[key] = token_data
+                finally:
+                    with self._token_lock:
+                        self._token_locks.pop(key, None)
+            return token_data
+    
+    def _request_access_token(self, credentials: SalesforceCredentials) -> TokenResponse:
+        """
+        Request an access token from Salesforce using password flow.
         
         The token endpoint is always https://login.salesforce.com/services/oauth2/token
         for password flow, regardless of the instance URL. The instance URL is only used
@@ -179,19 +363,7 @@ class SalesforceService:
         # The instance URL in credentials is only used for API calls after auth
         # Token endpoint is always login.salesforce.com or test.salesforce.com
         # Priority order: DEV -> STG -> PROD
-        instance_url = credentials.get('instance_url', '').lower()
-        
-        # Determine environment type from instance URL (priority: DEV -> STG -> PROD)
-        is_dev_org = (
-            'dev-ed' in instance_url or 
-            'develop.my.salesforce.com' in instance_url or
-            '.develop.' in instance_url
-        )
-        is_stg_org = (
-            'test.salesforce.com' in instance_url or 
-            'sandbox' in instance_url or 
-            '.cs' in instance_url
-        )
+        instance_url = credentials.get('instance_url', '')
         
         # Set login URLs to try based on environment detection
         # DEV orgs (developer edition) use production login endpoint
@@ -199,10 +371,10 @@ class SalesforceService:
         # PROD orgs use login.salesforce.com login endpoint
         login_urls_to_try = []
         
-        if is_dev_org:
+        if DEV_ORG_PATTERN.search(instance_url):
             login_urls_to_try = [SALESFORCE_PRODUCTION_URL]
             logger.info("Detected DEV org (Developer Edition) - using login.salesforce.com for authentication")
-        elif is_stg_org:
+        elif SANDBOX_ORG_PATTERN.search(instance_url):
             login_urls_to_try = [SALESFORCE_SANDBOX_URL, SALESFORCE_PRODUCTION_URL]
             logger.info("Detected STG org (Sandbox) - using test.salesforce.com for authentication")
         else:
@@ -221,13 +393,14 @@ class SalesforceService:
         last_error = None
         
         # Try each login URL
-        for login_url in login_urls_to_try:
-            token_url = f"{login_url}{SALESFORCE_TOKEN_URL}"
+        for index, login_url in enumerate(login_urls_to_try):
+            is_last = index == len(login_urls_to_try) - 1
+            token_url = SALESFORCE_TOKEN_ENDPOINTS[login_url]
             logger.info(f"Requesting access token from Salesforce...")
             logger.info(f"Trying token endpoint: {token_url}")
             
             try:
-                response = requests.post(token_url, headers=headers, data=payload, timeout=30)
+                response = self.session.post(token_url, headers=headers, data=payload, timeout=30)
                 
                 # If successful, return the token data
                 if response.ok:
@@ -248,7 +421,7 @@ class SalesforceService:
                 last_error = (response.status_code, error_detail)
                 
                 # If this is not the last URL to try and error suggests wrong endpoint, try next
-                if login_url != login_urls_to_try[-1] and response.status_code == 400:
+                if not is_last and response.status_code == 400:
                     logger.info(f"Trying alternative login URL...")
                     continue
                 
@@ -257,7 +430,7 @@ class SalesforceService:
                 
             except requests.exceptions.RequestException as e:
                 # Network error - if this is the last URL, raise it
-                if login_url == login_urls_to_try[-1]:
+                if is_last:
                     logger.error(f"Request error during authentication: {e}")
                     raise AuthenticationError(f"Network error during authentication: {e}")
                 # Otherwise, try next URL
@@ -319,7 +492,7 @@ class SalesforceService:
         instance_url = instance_url.rstrip('/')
         
         # Use REST API endpoint: /services/data/vXX.X/sobjects/
-        url = f"{instance_url}{SALESFORCE_OBJECTS_URL.format(version=self.api_version)}"
+        url = f"{instance_url}{self.urls.objects}"
         headers = {
             'Authorization': f'Bearer {access_token}',
             'Accept': 'application/json'
@@ -328,9 +501,9 @@ class SalesforceService:
         logger.info(f"Retrieving all Salesforce objects from: {url}")
         
         try:
-            response = requests.get(url, headers=headers, timeout=60)
+            response = self.session.get(url, headers=headers, timeout=60)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             objects = data.get('sobjects', [])
             
             # Filter out non-queryable objects and system objects
@@ -353,6 +526,9 @@ class SalesforceService:
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error while retrieving objects: {e}")
             raise APIRequestError(f"Network error while retrieving objects: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid objects response: {e}")
+            raise APIRequestError(f"Invalid response while retrieving objects: {e}")
     
     def get_installed_apps(self, access_token: str, instance_url: str) -> List[SalesforceApp]:
         """
@@ -381,11 +557,13 @@ class SalesforceService:
             'namespacePrefix': None,
             'description': 'Extract metadata for all objects in the org'
         })
+        # Labels already listed, for constant-time duplicate checks
+        seen_labels = {app['label'] for app in apps}
         
         try:
             # Use UI API to get all apps from App Launcher
-            ui_api_url = f"{instance_url}{SALESFORCE_UI_API_APPS_URL.format(version=self.api_version)}?formFactor=Large"
-            ui_response = requests.get(ui_api_url, headers=headers, timeout=60)
+            ui_api_url = f"{instance_url}{self.urls.ui_api_apps}?formFactor=Large"
+            ui_response = self.session.get(ui_api_url, headers=headers, timeout=60)
             
             if ui_response.ok:
                 ui_data = ui_response.json()
@@ -393,35 +571,21 @@ class SalesforceService:
                 
                 logger.info(f"Retrieved {len(ui_apps)} apps from UI API")
                 
+                # Look up namespaces for all apps in batched queries rather
+                # than one CustomApplication query per app
+                app_ids = [ui_app['id'] for ui_app in ui_apps if ui_app.get('id')]
+                namespaces = self._get_app_namespaces(app_ids, instance_url, headers)
+                
                 # Process apps from UI API
                 for ui_app in ui_apps:
                     app_id = ui_app.get('id', '')
                     app_label = ui_app.get('label', ui_app.get('name', 'Unknown App'))
                     app_name = ui_app.get('name', app_label)
                     
-                    # Try to get namespace from app metadata or query CustomApplication
-                    namespace = None
+                    # Query results use 18-character Ids; match 15-character ones too
+                    namespace = namespaces.get(app_id) or namespaces.get(app_id[:15])
                     app_description = f"Objects from {app_label} app"
                     
-                    # Query CustomApplication to get namespace if available
-                    if app_id:
-                        try:
-                            # Escape single quotes in app_id for SOQL
-                            safe_app_id = app_id.replace("'", "\\'")
-                            app_query = f"SELECT Id, Name, Label, NamespacePrefix FROM CustomApplication WHERE Id = '{safe_app_id}'"
-                            app_query_url = f"{instance_url}{SALESFORCE_QUERY_URL.format(version=self.api_version)}"
-                            app_query_params = {'q': app_query}
-                            app_query_response = requests.get(app_query_url, headers=headers, params=app_query_params, timeout=30)
-                            
-                            if app_query_response.ok:
-                                app_query_data = app_query_response.json()
-                                app_records = app_query_data.get('records', [])
-                                if app_records:
-                                    namespace = app_records[0].get('NamespacePrefix')
-                        except Exception as e:
-                            logger.debug(f"Could not get namespace for app {app_label}: {e}")
-                            pass  # If query fails, continue without namespace
-                    
                     # Add app (with or without namespace)
                     # For apps without namespace, we'll still show them but note they use standard objects
                     app_entry = {
@@ -433,16 +597,17 @@ class SalesforceService:
                     }
                     
                     # Only add if not already in list (check by label)
-                    if not any(a['label'] == app_label for a in apps):
+                    if app_label not in seen_labels:
+                        seen_labels.add(app_label)
                         apps.append(app_entry)
             else:
                 logger.warning(f"UI API request failed: {ui_response.status_code} - {ui_response.text}")
                 # Fallback to CustomApplication query if UI API fails
                 try:
                     app_query = "SELECT Id, Name, Label, NamespacePrefix FROM CustomApplication WHERE IsVisibleInAppLauncher = true"
-                    app_url = f"{instance_url}{SALESFORCE_QUERY_URL.format(version=self.api_version)}"
+                    app_url = f"{instance_url}{self.urls.query}"
                     app_params = {'q': app_query}
-                    app_response = requests.get(app_url, headers=headers, params=app_params, timeout=60)
+                    app_response = self.session.get(app_url, headers=headers, params=app_params, timeout=60)
                     
                     if app_response.ok:
                         app_data = app_response.json()
@@ -454,7 +619,8 @@ class SalesforceService:
                             app_name = app_record.get('Name', 'Unknown')
                             
                             # Add all apps, with or without namespace
-                            if not any(a['label'] == app_label for a in apps):
+                            if app_label not in seen_labels:
+                                seen_labels.add(app_label)
                                 apps.append({
                                     'id': app_record.get('Id', ''),
                                     'name': app_name,
@@ -468,13 +634,14 @@ class SalesforceService:
             # Also query InstalledSubscriberPackage for installed packages with namespaces
             try:
                 package_query = "SELECT Id, SubscriberPackageId, SubscriberPackage.NamespacePrefix, SubscriberPackage.Name FROM InstalledSubscriberPackage"
-                package_url = f"{instance_url}{SALESFORCE_QUERY_URL.format(version=self.api_version)}"
+                package_url = f"{instance_url}{self.urls.query}"
                 package_params = {'q': package_query}
-                package_response = requests.get(package_url, headers=headers, params=package_params, timeout=60)
+                package_response = self.session.get(package_url, headers=headers, params=package_params, timeout=60)
                 
                 if package_response.ok:
                     package_data = package_response.json()
                     package_records = package_data.get('records', [])
+                    seen_namespaces = {app['namespacePrefix'] for app in apps}
                     
                     for record in package_records:
                         package_info = record.get('SubscriberPackage', {})
@@ -483,7 +650,8 @@ class SalesforceService:
                         
                         if namespace:
                             # Check if already added from UI API
-                            if not any(a['namespacePrefix'] == namespace for a in apps):
+                            if namespace not in seen_namespaces:
+                                seen_namespaces.add(namespace)
                                 apps.append({
                                     'id': record.get('Id', ''),
                                     'name': namespace,
@@ -514,6 +682,63 @@ class SalesforceService:
             logger.warning(f"Request error while retrieving apps (continuing with all objects): {e}")
             return apps
     
+    def _get_app_namespaces(
+        self,
+        app_ids: List[str],
+        instance_url: str,
+        headers: Dict[str, str]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Look up CustomApplication namespace prefixes for a set of app Ids.
+        
+        Ids are queried in batches of SALESFORCE_SOQL_ID_BATCH_SIZE with a
+        single "WHERE Id IN (...)" query per batch. A failed batch is logged
+        and its apps are left without a namespace.
+        
+        Args:
+            app_ids: CustomApplication Ids from the UI API
+            instance_url: Salesforce instance URL, without a trailing slash
+            headers: Request headers including the Authorization header
+            
+        Returns:
+            Namespace prefix keyed by both the 18- and 15-character app Id
+        """
+        namespaces: Dict[str, Optional[str]] = {}
+        query_url = f"{instance_url}{self.urls.query}"
+        
+        for start in range(0, len(app_ids), SALESFORCE_SOQL_ID_BATCH_SIZE):
+            batch = app_ids[start:start + SALESFORCE_SOQL_ID_BATCH_SIZE]
+            id_list = ", ".join(self._soql_literal(app_id) for app_id in batch)
+            query = f"SELECT Id, NamespacePrefix FROM CustomApplication WHERE Id IN ({id_list})"
+            try:
+                response = self.session.get(query_url, headers=headers, params={'q': query}, timeout=30)
+                if not response.ok:
+                    logger.debug(f"Could not get app namespaces: {response.status_code} - {response.text}")
+                    continue
+                for record in response.json().get('records', []):
+                    record_id = record.get('Id', '')
+                    namespaces[record_id] = namespaces[record_id[:15]] = record.get('NamespacePrefix')
+            except Exception as e:
+                # If the query fails, continue without namespaces
+                logger.debug(f"Could not get app namespaces: {e}")
+        
+        return namespaces
+    
+    @staticmethod
+    def _soql_literal(value: str) -> str:
+        """
+        Quote a value as a SOQL string literal.
+        
+        SOQL escapes with backslashes, so backslashes are escaped before quotes.
+        
+        Args:
+            value: Raw string value
+            
+        Returns:
+            Quoted and escaped SOQL literal
+        """
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    
     def get_object_fields(
         self, 
         access_token: str, 
@@ -540,7 +765,7 @@ class SalesforceService:
         instance_url = instance_url.rstrip('/')
         
         # Use REST API describe endpoint: /services/data/vXX.X/sobjects/{ObjectName}/describe/
-        url = f"{instance_url}{SALESFORCE_DESCRIBE_URL.format(version=self.api_version, object_name=object_name)}"
+        url = f"{instance_url}{self.urls.describe.format(object_name=object_name)}"
         headers = {
             'Authorization': f'Bearer {access_token}',
             'Accept': 'application/json'
@@ -549,15 +774,15 @@ class SalesforceService:
         logger.debug(f"Retrieving fields for object: {object_name} from: {url}")
         
         try:
-            response = requests.get(url, headers=headers, timeout=60)
+            response = self.session.get(url, headers=headers, timeout=60)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # The describe response has 'fields' at the root level
-            fields = data.get('fields', [])
+            fields = _slim_fields(data.get('fields', []))
             
             # Filter out system fields that aren't useful for data modeling
-            # Keep all fields but we can filter in extract_metadata if needed
+            # Keep all fields but we can filter in iter_metadata_rows if needed
             logger.debug(f"Retrieved {len(fields)} fields for object: {object_name}.")
             return fields
         except requests.exceptions.HTTPError as e:
@@ -572,8 +797,179 @@ class SalesforceService:
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error while retrieving fields for {object_name}: {e}")
             raise APIRequestError(f"Network error while retrieving fields for {object_name}: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid describe response for {object_name}: {e}")
+            raise APIRequestError(f"Invalid response while retrieving fields for {object_name}: {e}")
     
-    def extract_metadata(
+    def get_object_fields_batch(
+        self,
+        access_token: str,
+        instance_url: str,
+        object_names: List[str]
+    ) -> Dict[str, List[SalesforceField]]:
+        """
+        Retrieve fields for several objects with a single composite request.
+        
+        Each object's describe call becomes one subrequest, so up to
+        SALESFORCE_COMPOSITE_MAX_SUBREQUESTS objects cost one round-trip.
+        Subrequests are independent (allOrNone is false); failed describes
+        are logged. Objects rejected with 403 or 404, which fail the same way
+        on every run, map to an empty field list; objects that failed for
+        other reasons are left out of the result.
+        
+        Reference: https://developer.salesforce.com/docs/atlas.en-us.api_rest.meta/api_rest/resources_composite_composite.htm
+        
+        Args:
+            access_token: Salesforce OAuth access token
+            instance_url: Salesforce instance URL (from token response)
+            object_names: Names of the Salesforce objects, at most SALESFORCE_COMPOSITE_MAX_SUBREQUESTS
+            
+        Returns:
+            Field metadata keyed by object name
+            
+        Raises:
+            APIRequestError: If the composite request itself fails
+        """
+        instance_url = instance_url.rstrip('/')
+        url = f"{instance_url}{self.urls.composite}"
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Accept': 'application/json'
+        }
+        payload = {
+            'allOrNone': False,
+            'compositeRequest': [
+                {
+                    'method': 'GET',
+                    'url': self.urls.describe.format(object_name=object_name),
+                    'referenceId': f"describe{index}"
+                }
+                for index, object_name in enumerate(object_names)
+            ]
+        }
+        
+        logger.debug(f"Retrieving fields for {len(object_names)} objects in one composite request")
+        
+        try:
+            response = self.composite_session.post(url, headers=headers, json=payload, timeout=120)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+        except requests.exceptions.HTTPError as e:
+            error_detail = response.text or str(e)
+            logger.error(f"Composite describe request failed: {error_detail}")
+            raise APIRequestError(f"Failed to retrieve fields: {error_detail}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error during composite describe: {e}")
+            raise APIRequestError(f"Network error while retrieving fields: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid composite describe response: {e}")
+            raise APIRequestError(f"Invalid response while retrieving fields: {e}")
+        
+        names_by_reference = {f"describe{index}": name for index, name in enumerate(object_names)}
+        fields_by_object: Dict[str, List[SalesforceField]] = {}
+        errors: List[str] = []
+        for subresponse in data.get('compositeResponse', []):
+            object_name = names_by_reference.get(subresponse.get('referenceId'))
+            if object_name is None:
+                continue
+            body = subresponse.get('body')
+            status_code = subresponse.get('httpStatusCode') or 0
+            if status_code == 200 and isinstance(body, dict):
+                fields_by_object[object_name] = _slim_fields(body.get('fields', []))
+                continue
+            if status_code in DESCRIBE_PERMANENT_ERROR_STATUSES:
+                fields_by_object[object_name] = []
+            # Error bodies are a list of {message, errorCode} entries
+            errors.append(f"{object_name}: {body}")
+        
+        # One summary per batch rather than a warning per failed object
+        if errors:
+            logger.warning("Describe failed for %d of %d objects: %s", len(errors), len(object_names), "; ".join(errors))
+        return fields_by_object
+    
+    def _describe_object_batch(
+        self,
+        access_token: str,
+        instance_url: str,
+        object_names: List[str]
+    ) -> Dict[str, List[SalesforceField]]:
+        """
+        Retrieve fields for a batch of objects, reusing recently cached describes.
+        
+        Only objects missing from the describe cache are requested. Objects
+        the composite request rejected with 403 or 404 are cached with no
+        fields, so repeated runs skip describes that are bound to fail. Objects
+        whose subrequest failed otherwise, or every object if the composite
+        request fails as a whole (e.g. the composite resource is unavailable
+        to the user), are described on their own.
+        
+        Args:
+            access_token: Salesforce OAuth access token
+            instance_url: Salesforce instance URL (from token response)
+            object_names: Names of the Salesforce objects
+            
+        Returns:
+            Field metadata keyed by object name; failed objects have no fields
+        """
+        cache_prefix = (instance_url.rstrip('/'), token_digest(access_token))
+        with self._describe_cache_lock:
+            fields_by_object = {
+                object_name: self._describe_cache[cache_prefix + (object_name,)]
+                for object_name in object_names
+                if cache_prefix + (object_name,) in self._describe_cache
+            }
+        missing = [name for name in object_names if name not in fields_by_object]
+        if not missing:
+            return fields_by_object
+        
+        try:
+            fetched = self.get_object_fields_batch(access_token, instance_url, missing)
+        except Exception as e:
+            logger.warning(f"Composite describe failed, describing objects one by one: {e}")
+            fetched = {}
+        cacheable = dict(fetched)
+        
+        # The per-object fallback returns an empty list for any failure,
+        # including transient ones, so only its successful describes are cached
+        for object_name in missing:
+            if object_name not in fetched:
+                fields = self._describe_object_fields(access_token, instance_url, object_name)
+                fetched[object_name] = fields
+                if fields:
+                    cacheable[object_name] = fields
+        
+        with self._describe_cache_lock:
+            for object_name, fields in cacheable.items():
+                self._describe_cache[cache_prefix + (object_name,)] = fields
+        fields_by_object.update(fetched)
+        return fields_by_object
+    
+    def _describe_object_fields(
+        self,
+        access_token: str,
+        instance_url: str,
+        object_name: str
+    ) -> List[SalesforceField]:
+        """
+        Retrieve fields for an object, logging and swallowing per-object failures.
+        
+        Args:
+            access_token: Salesforce OAuth access token
+            instance_url: Salesforce instance URL (from token response)
+            object_name: Name of the Salesforce object
+            
+        Returns:
+            List of field metadata, or an empty list if the describe call failed
+        """
+        try:
+            return self.get_object_fields(access_token, instance_url, object_name)
+        except APIRequestError as e:
+            logger.warning(f"Error processing object {object_name}: {e}")
+        except Exception as e:
+            logger.warning(f"Unexpected error processing object {object_name}: {e}")
+        return []
+    
+    def iter_metadata_rows(
         self,
         access_token: str,
         instance_url: str,
@@ -581,10 +977,13 @@ class SalesforceService:
         should_continue = None,
         log_callback = None,
         namespace_prefix: Optional[str] = None
-    ) -> List[MetadataRow]:
+    ) -> Iterator[MetadataRow]:
         """
         Extract metadata for all objects and their fields using Salesforce REST API.
         
+        Rows are yielded object by object as describes complete, so callers
+        can write them out without holding the whole org's metadata in memory.
+        
         Reference: https://developer.salesforce.com/docs/atlas.en-us.api_rest.meta/api_rest/resources_list.htm
         
         Args:
@@ -595,10 +994,10 @@ class SalesforceService:
             log_callback: Optional callback function(message: str) to log progress messages
             namespace_prefix: Optional namespace prefix to filter objects (e.g., 'ns' for objects like ns__CustomObject__c)
             
-        Returns:
-            List of metadata rows
+        Yields:
+            Metadata rows, grouped by object
         """
-        metadata_rows: List[MetadataRow] = []
+        row_count = 0
         
         # Filter objects by namespace prefix if provided
         # Note: namespace_prefix can be None, 'all', or an actual namespace
@@ -607,9 +1006,10 @@ class SalesforceService:
             namespace_prefix = namespace_prefix.strip()
             
             # Filter by namespace prefix - objects with this namespace
+            name_prefix = f"{namespace_prefix}__"
             filtered_objects = [
                 obj for obj in objects 
-                if obj.get('name', '').startswith(f"{namespace_prefix}__")
+                if obj.get('name', '').startswith(name_prefix)
             ]
             if log_callback:
                 log_callback(f"Filtering objects by app namespace '{namespace_prefix}': {len(filtered_objects)} objects found")
@@ -626,60 +1026,82 @@ class SalesforceService:
         
         total_objects = len(filtered_objects)
         processed_count = 0
+        object_names = [obj.get('name') for obj in filtered_objects if obj.get('name')]
+        # Report progress about 100 times per extraction rather than once per
+        # object, so large orgs do not flood the log or push out earlier entries
+        log_every = max(1, len(object_names) // 100)
         
-        for obj in filtered_objects:
-            # Check if processing should continue
-            if should_continue and not should_continue():
-                message = "Processing terminated by user."
-                logger.info(message)
-                if log_callback:
-                    log_callback(message)
-                break
-            
-            object_name = obj.get('name')
-            if not object_name:
-                continue
+        # Objects are described in composite batches, which run concurrently on
+        # a bounded pool; results are consumed in submission order so each
+        # object's rows stay contiguous in the output
+        batches = iter([
+            object_names[start:start + SALESFORCE_COMPOSITE_MAX_SUBREQUESTS]
+            for start in range(0, len(object_names), SALESFORCE_COMPOSITE_MAX_SUBREQUESTS)
+        ])
+        executor = ThreadPoolExecutor(
+            max_workers=self.describe_concurrency,
+            thread_name_prefix="sfdc-describe"
+        )
+        # Only a window of batches is submitted ahead of the consumer, so
+        # finished describes cannot pile up in memory while rows are written
+        pending: Deque[Tuple[List[str], Future]] = deque()
+        
+        def submit_next_batch() -> None:
+            batch = next(batches, None)
+            if batch is not None:
+                pending.append((batch, executor.submit(
+                    self._describe_object_batch, access_token, instance_url, batch
+                )))
+        
+        def iter_described() -> Iterator[Tuple[str, List[SalesforceField]]]:
+            while pending:
+                batch, future = pending.popleft()
+                fields_by_object = future.result()
+                submit_next_batch()
+                for object_name in batch:
+                    yield object_name, fields_by_object.get(object_name, [])
+        
+        completed = False
+        try:
+            for _ in range(self.describe_concurrency * 2):
+                submit_next_batch()
+            described = iter_described()
+            for object_name, fields in described:
+                # Check if processing should continue
+                if should_continue and not should_continue():
+                    message = "Processing terminated by user."
+                    logger.info(message)
+                    if log_callback:
+                        log_callback(message)
+                    break
+                
+                processed_count += 1
+                if processed_count % log_every == 0 or processed_count == len(object_names):
+                    message = f"Processing object {processed_count}/{total_objects}: {object_name}"
+                    logger.info(message)
+                    if log_callback:
+                        log_callback(message)
+                
+                object_rows = [
+                    _metadata_row(object_name, field)
+                    for field in fields
+                    if field.get('name')
+                ]
+                row_count += len(object_rows)
+                yield from object_rows
+            else:
+                completed = True
+        finally:
+            # Drop describe calls that have not started yet (e.g. after termination)
+            executor.shutdown(wait=False, cancel_futures=True)
             
-            processed_count += 1
-            message = f"Processing object {processed_count}/{total_objects}: {object_name}"
-            logger.info(message)
+            # Also reached when the user terminates the extraction or the
+            # consumer closes the generator early
+            if completed:
+                completion_message = f"Metadata extraction completed. Processed {processed_count} objects, extracted {row_count} field records."
+            else:
+                completion_message = f"Metadata extraction stopped after {processed_count} of {total_objects} objects, extracted {row_count} field records."
+            logger.info(completion_message)
             if log_callback:
-                log_callback(message)
-            
-            try:
-                fields = self.get_object_fields(access_token, instance_url, object_name)
-                
-                for field in fields:
-                    field_name = field.get('name')
-                    if not field_name:
-                        continue
-                    
-                    # Extract relationship information
-                    reference_to = field.get('referenceTo', [])
-                    relationship_name = field.get('relationshipName', '')
-                    
-                    # Build metadata row
-                    metadata_rows.append({
-                        'Object': object_name,
-                        'Field': field_name,
-                        'Type': field.get('type', 'N/A'),
-                        'Length': str(field.get('length', 'N/A')) if field.get('length') else 'N/A',
-                        'Precision': str(field.get('precision', 'N/A')) if field.get('precision') else 'N/A',
-                        'Scale': str(field.get('scale', 'N/A')) if field.get('scale') else 'N/A',
-                        'ReferenceTo': ','.join(reference_to) if reference_to else 'N/A',
-                        'RelationshipName': relationship_name if relationship_name else 'N/A'
-                    })
-                    
-            except APIRequestError as e:
-                logger.warning(f"Error processing object {object_name}: {e}")
-                continue
-            except Exception as e:
-                logger.warning(f"Unexpected error processing object {object_name}: {e}")
-                continue
-        
-        completion_message = f"Metadata extraction completed. Processed {processed_count} objects, extracted {len(metadata_rows)} field records."
-        logger.info(completion_message)
-        if log_callback:
-            log_callback(completion_message)
-        return metadata_rows
+                log_callback(completion_message)
 
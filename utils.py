@@ -1,21 +1,90 @@
 """Utility functions."""
+import hashlib
 import logging
-from typing import Dict, Optional
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional
 from urllib.parse import urlparse
 
-from config import get_settings, STATUS_STARTING, STATUS_RUNNING, STATUS_COMPLETED, STATUS_ERROR, STATUS_TERMINATED
+import orjson
+import requests
+from fastapi.responses import JSONResponse
+from requests.adapters import HTTPAdapter
+from starlette.convertors import Convertor
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+from urllib3.util.retry import Retry
+
+from config import get_settings, FILE_TYPE_LUCID, FILE_TYPE_METADATA, STATUS_STARTING, STATUS_RUNNING, STATUS_COMPLETED, STATUS_ERROR, STATUS_TERMINATED
 from models import ProcessData
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson instead of the stdlib json module."""
+    
+    def render(self, content) -> bytes:
+        """Serialize content to JSON bytes."""
+        return orjson.dumps(content)
+
+
+class ProcessIdConvertor(Convertor):
+    """Path convertor matching process IDs (URL-safe tokens), so malformed IDs 404 at routing."""
+    
+    regex = "[A-Za-z0-9_-]{1,64}"
+    
+    def convert(self, value: str) -> str:
+        """Return the matched path segment unchanged."""
+        return value
+    
+    def to_string(self, value: str) -> str:
+        """Render a process ID into a path."""
+        return value
+
+
+class FileTypeConvertor(Convertor):
+    """Path convertor matching the downloadable file types."""
+    
+    regex = f"{FILE_TYPE_METADATA}|{FILE_TYPE_LUCID}"
+    
+    def convert(self, value: str) -> str:
+        """Return the matched path segment unchanged."""
+        return value
+    
+    def to_string(self, value: str) -> str:
+        """Render a file type into a path."""
+        return value
+
+
+class RangeAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that leaves byte-range requests uncompressed.
+    
+    Content-Range offsets refer to the file on disk, so compressing a partial
+    download would break resumed CSV downloads.
+    """
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Compress the response unless the request asks for a byte range."""
+        if scope["type"] == "http" and any(name == b"range" for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+@lru_cache(maxsize=16)
 def get_redirect_uri(request_base_url: str, configured_uri: Optional[str] = None, callback_path: str = "/google-drive-callback") -> str:
     """
     Get OAuth2 redirect URI from configuration or construct from request.
     
+    Memoized: a deployment only sees a handful of base URLs, so each
+    (base URL, configured URI, callback path) is resolved once.
+    
     Args:
-        request_base_url: Base URL from the request
+        request_base_url: Base URL from the request, as a string (cache key)
         configured_uri: Pre-configured redirect URI from settings
         callback_path: Callback path (default: /google-drive-callback)
         
@@ -30,31 +99,83 @@ def get_redirect_uri(request_base_url: str, configured_uri: Optional[str] = None
     return f"{base_url}{callback_path}"
 
 
+def create_retrying_session(
+    pool_maxsize: int,
+    total: int,
+    allowed_methods: FrozenSet[str] = frozenset({'GET'})
+) -> requests.Session:
+    """
+    Create a pooled session that retries transient failures.
+    
+    Requests whose method is in allowed_methods are retried on rate limits
+    (429), transient server errors and read errors with exponential backoff,
+    honoring Retry-After. Other methods (e.g. non-idempotent POSTs) are only
+    retried when the connection fails before the request is sent. The final
+    response is returned so raise_for_status still reports persistent failures.
+    
+    Args:
+        pool_maxsize: Keep-alive connections kept per host
+        total: Maximum number of retries per request
+        allowed_methods: HTTP methods that are safe to resend
+        
+    Returns:
+        Configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=total,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=allowed_methods,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+    session.mount('https://', adapter)
+    return session
+
+
 def create_process_data() -> ProcessData:
     """
     Create a new process data structure.
     
     Returns:
-        Initialized process data dictionary
+        Initialized process data
     """
-    from datetime import datetime
-    return {
-        'status': STATUS_STARTING,
-        'logs': [],
-        'created_at': datetime.now().isoformat()
-    }
+    return ProcessData(
+        status=STATUS_STARTING,
+        logs=deque(maxlen=settings.max_log_entries),
+        created_at=datetime.now().isoformat()
+    )
 
 
-def validate_file_type(file_type: str) -> bool:
+def token_digest(access_token: str) -> str:
     """
-    Validate file type parameter.
+    Derive a short cache key from an access token, so raw tokens are not kept as keys.
     
     Args:
-        file_type: File type to validate
+        access_token: OAuth2 access token
         
     Returns:
-        True if valid, False otherwise
+        Hex digest of the token
     """
-    from config import FILE_TYPE_METADATA, FILE_TYPE_LUCID
-    return file_type in (FILE_TYPE_METADATA, FILE_TYPE_LUCID)
+    return hashlib.blake2b(access_token.encode(), digest_size=8).hexdigest()
+
 
+def is_namespace_prefix(value: str) -> bool:
+    """
+    Check whether an app selection value is a namespace prefix rather than an app ID.
+    
+    App IDs start with '0' and are 15/18 characters long; namespace prefixes
+    are short and never contain the '__' separator.
+    
+    Args:
+        value: Selected app namespace or ID
+        
+    Returns:
+        True if the value looks like a namespace prefix, False otherwise
+    """
+    return len(value) < 20 and value[:1] != '0' and value.find('__') == -1